@@ -1,15 +1,23 @@
 """ A class to perform automatic differentiation on scalar and vector functions"""
 
 import inspect
+import itertools
 import numpy as np
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import Callable, Union
-from toposort import toposort_flatten
 
 from autodiff.utils.dual_numbers import DualNumber
-from autodiff.utils.comp_graph import CompGraphNode
+from autodiff.utils.comp_graph import AddedNodes, CompGraphNode
+from autodiff.utils.tape import Tape
 from autodiff.utils.auto_diff_math import *
 
+# number of node evaluations (nodes of the tapes times points) from which the
+# tapes of a vector function are re-evaluated at many points in parallel
+# threads; below it the threads cost more than they save
+_PARALLEL_WORK = 1_000_000
+
 
 class AutoDiff:
     """ A class to perform automatic differentiation on scalar and vector functions 
@@ -33,9 +41,16 @@ class AutoDiff:
     get_jacobian(self, point, mode="forward"):
         Computes the Jacobian matrix evaluated at the given point
 
-    get_derivative(self, point, seed_vector, mode="forward"):
+    get_jacobian_batch(self, points, mode="forward"):
+        Computes the Jacobian matrices evaluated at many points at once
+
+    get_derivative(self, point, seed_vector, mode="forward", out=None):
         Computes the directional derivative evaluated at the point in the direction and 
         magnitude of seed_vector
+
+    get_derivatives(self, point, seed_vectors, mode="forward"):
+        Computes the directional derivatives evaluated at the point in the directions and 
+        magnitudes of many seed vectors at once
     """
     def __init__(self, f: Union[list, Callable, int, float]):
         """
@@ -74,6 +89,10 @@ class AutoDiff:
 
         self.computational_graph = None
 
+        # tapes recorded in reverse mode, keyed by the position of the
+        # function in f; a new AutoDiff object traces its functions again
+        self._tapes = {}
+
     def __str__(self):
         """ returns a description of the functions contained in the AutoDiff object """
 
@@ -121,19 +140,49 @@ class AutoDiff:
         if not isinstance(vector, (int, float, list, np.ndarray)):
             raise TypeError("Invalid input type")
 
-        if isinstance(vector, list):
-            if sum([not isinstance(v, (int, float)) for v in vector]) > 0:
-                raise TypeError("Invalid input type")
-
-        if isinstance(vector, np.ndarray):
-            if sum([not isinstance(v.item(), (int, float))
-                    for v in vector]) > 0:
-                raise TypeError("Invalid input type")
-            if vector.ndim != 1:
+        if isinstance(vector, (list, np.ndarray)):
+            if self._as_numeric_array(vector).ndim != 1:
                 raise TypeError("Invalid input array dimension")
 
         return
 
+    def _as_numeric_array(self, values):
+        """ convert a sequence of numbers, or of sequences of numbers, to a numpy array, 
+            without converting e.g. numeric strings
+
+        Parameters
+        ----------
+        values: list or numpy ndarray
+            the numbers to convert
+
+        Returns
+        -------
+        numpy ndarray
+            the numbers, as an array of booleans, integers, floats or (if they are Python numbers 
+            of several types) objects
+
+        Raises
+        ------
+        TypeError
+            If an element is not a number or the sequences have different lengths
+        """
+        # lists are checked as arrays, in a single conversion; nested lists
+        # of different lengths cannot be converted
+        try:
+            array = np.asarray(values)
+        except ValueError:
+            raise TypeError("Invalid input type")
+
+        # arrays of booleans, integers or floats are checked by their dtype;
+        # only arrays of objects are checked element by element
+        if array.dtype.kind == "O":
+            if not all(isinstance(v, (int, float)) for v in array.flat):
+                raise TypeError("Invalid input type")
+        elif array.dtype.kind not in "biuf":
+            raise TypeError("Invalid input type")
+
+        return array
+
     def get_value(self, point: Union[int, float, list, np.ndarray]):
         """ evaluate f at point
 
@@ -231,10 +280,14 @@ class AutoDiff:
         for func in self.f:
             if isinstance(func, (int, float)):
                 ret = np.append(ret, 0)
-            elif isinstance(func(point_dual), (int, float)):
+                continue
+
+            # each function is called once
+            val = func(point_dual)
+            if isinstance(val, (int, float)):
                 ret = np.append(ret, 0)
-            elif isinstance(func(point_dual), DualNumber):
-                ret = np.append(ret, func(point_dual).dual)
+            elif isinstance(val, DualNumber):
+                ret = np.append(ret, val.dual)
 
         # return as a scalar if input is scalar
         if isinstance(point, (int, float)) and len(ret) == 1:
@@ -253,7 +306,10 @@ class AutoDiff:
         point: int, float, list, or numpy ndarray
             a single or a sequence of numbers defining the point for the functions to evaluate at
         mode: {"forward", "f", "reverse", "r"}
-            option to perform automatic differentiation using forward or reverse mode; default is "forward"
+            option to perform automatic differentiation using forward or reverse mode; default is "forward"; 
+            in reverse mode the computational graph of each function is recorded on the first call and 
+            re-evaluated at later points; a function that compares nodes (e.g. in an if statement) is 
+            traced again at each point, and otherwise the operations it applies must not depend on the point
 
         Returns
         -------
@@ -281,12 +337,23 @@ class AutoDiff:
         if not isinstance(mode, str):
             raise ValueError("Invalid mode")
 
-        if mode.lower() in ["forward", "f"]:
+        if mode.lower() not in ["forward", "f", "reverse", "r"]:
+            raise ValueError("Invalid mode")
+
+        if all(isinstance(func, (int, float)) for func in self.f):
+            # all the functions are constants, so there is nothing to evaluate
+            if isinstance(point, (int, float)):
+                jacobian = np.zeros(len(self.f))
+            else:
+                jacobian = np.zeros((len(self.f), len(point)))
+            if mode.lower() in ["reverse", "r"]:
+                self.computational_graph = [None] * len(self.f)
+                if jacobian.size == 1:
+                    jacobian = jacobian.flatten()
+        elif mode.lower() in ["forward", "f"]:
             jacobian = self._get_jacobian_forward(point)
-        elif mode.lower() in ["reverse", "r"]:
-            jacobian = self._get_jacobian_reverse(point)
         else:
-            raise ValueError("Invalid mode")
+            jacobian = self._get_jacobian_reverse(point)
 
         # reshape Jacobian matrix
         # Jacobian matrix should be a row vector for scalar function with multiple input
@@ -309,24 +376,49 @@ class AutoDiff:
 
         assert isinstance(point, (int, float, list, np.ndarray))
 
+        # each column of partial derivatives is written in place instead of
+        # stacking and transposing the columns
         if isinstance(point, (int, float)):
-            ret = self.get_partial(point)
+            jacobian = np.empty(len(self.f))
+            jacobian[:] = self.get_partial(point)
         else:
             if isinstance(point, list):
                 point = np.array(point)
 
-            ret = []
-            for i in range(len(point)):
-                # append the partial derivatives computed for each coordinate
-                ret += [self.get_partial(point, var_index=i)]
-
-        # Jacobian should always be returned as matrices
-        if isinstance(ret, (int, float)):
-            ret = [ret]
+            jacobian = np.empty((len(self.f), len(point)))
+            try:
+                self._get_jacobian_forward_rows(point, jacobian)
+            except (TypeError, ValueError):
+                # functions that cannot run on dual numbers with vector dual
+                # parts are differentiated one coordinate at a time
+                for i in range(len(point)):
+                    # the partial derivatives computed for each coordinate
+                    jacobian[:, i] = self.get_partial(point, var_index=i)
 
-        jacobian = np.transpose(np.array(ret))
         return jacobian
 
+    def _get_jacobian_forward_rows(self, point: np.ndarray,
+                                   jacobian: np.ndarray):
+        """ computes the Jacobian matrix using forward mode in one evaluation of each function, 
+            seeding the inputs with the rows of the identity matrix as dual parts """
+
+        seeds = np.eye(len(point))
+        point_dual = np.empty(len(point), dtype=object)
+        point_dual[:] = [
+            DualNumber(v.item(), seed) for v, seed in zip(point, seeds)
+        ]
+
+        for i, func in enumerate(self.f):
+            if isinstance(func, (int, float)):
+                jacobian[i] = 0
+                continue
+
+            val = func(point_dual)
+            if isinstance(val, (int, float)):
+                jacobian[i] = 0
+            else:
+                jacobian[i] = val.dual
+
     def _get_jacobian_reverse(self, point: Union[int, float, list,
                                                  np.ndarray]):
         """ computes the Jacobian matrix using reverse mode """
@@ -342,27 +434,47 @@ class AutoDiff:
         else:
             shape = (len(point), )
 
-        for func in self.f:
+        # the functions traced in this call share their input nodes and their
+        # table of added nodes, so that common subexpressions are built once
+        added_nodes = None
+
+        # the inputs as Python numbers; arithmetic on numpy scalars is several
+        # times slower than on Python floats
+        values = [point] if isinstance(point, (int, float)) else list(point)
+        values = [v.item() if isinstance(v, np.generic) else v for v in values]
+
+        # (row of the Jacobian, index in the computational graph, output
+        # node) of each function traced in this call
+        traced = []
+
+        for i, func in enumerate(self.f):
+            tape = self._tapes.get(i)
+            if tape is not None and tape.n_inputs == len(values):
+                # re-evaluate the recorded computational graph; outside the
+                # domain of its operations the function is traced again
+                evaluated = tape.evaluate(values)
+            else:
+                evaluated = None
+
             if isinstance(func, (int, float)):
                 jacobian += [np.zeros(shape)]
 
+            elif evaluated is not None:
+                jacobian += [np.array(evaluated[1])]
+                self.computational_graph += [tape]
+
             else:
                 # forward pass
-                added_nodes = {}
+                if added_nodes is None:
+                    added_nodes = AddedNodes()
 
-                # convert input to CompGraphNodes
-                if isinstance(point, (int, float)):
-                    input_nodes = CompGraphNode(point, added_nodes=added_nodes)
-                elif isinstance(point, np.ndarray):
-                    input_nodes = [
-                        CompGraphNode(p.item(), added_nodes=added_nodes)
-                        for p in point
-                    ]
-                else:
+                    # convert input to CompGraphNodes
                     input_nodes = [
-                        CompGraphNode(p, added_nodes=added_nodes)
-                        for p in point
+                        CompGraphNode(v, added_nodes=added_nodes)
+                        for v in values
                     ]
+                    if isinstance(point, (int, float)):
+                        input_nodes = input_nodes[0]
 
                 output_node = func(input_nodes)
 
@@ -371,37 +483,48 @@ class AutoDiff:
                     self.computational_graph += [None]
 
                 else:
-                    # reverse pass
-                    if isinstance(input_nodes, CompGraphNode):
-                        input_nodes = [input_nodes]
-
-                    # build adjacency list (a dictionary) for toposort
-                    # the inputs do not have parents
-                    adj_list = {n: set() for n in input_nodes}
-
-                    # add intermediate nodes to the adjacency list
-                    for node in added_nodes.values():
-                        adj_list[node] = set(node.parents)
-
-                    # toposort the computational graph
-                    sorted_list = toposort_flatten(adj_list, sort=False)
-
-                    # set last node's adjoint
-                    output_node.adjoint = 1
-
-                    # compute adjoint for each node
-                    for node in reversed(sorted_list):
-                        if node.parents is not None and node.partials is not None:
-                            for parent, partial in zip(node.parents,
-                                                       node.partials):
-                                parent.adjoint += node.adjoint * partial
-
-                    # the chain-rule incorporated partial is stored as the input nodes adjoint
-                    jacobian += [
-                        np.array([node.adjoint for node in input_nodes])
-                    ]
-                    # store computational_graph
-                    self.computational_graph += [adj_list]
+                    traced += [(i, len(self.computational_graph),
+                                output_node)]
+                    jacobian += [None]
+                    self.computational_graph += [None]
+
+        if traced:
+            # reverse pass; the adjoints of all the traced functions are
+            # propagated in a single sweep, as vectors with one entry per
+            # function
+            inputs = (input_nodes
+                      if isinstance(input_nodes, list) else [input_nodes])
+            k = len(traced)
+            for node in itertools.chain(inputs, added_nodes.values()):
+                node.adjoint = np.zeros(k) if k > 1 else 0
+
+            # set the output nodes' adjoints
+            seeds = np.eye(k) if k > 1 else [1]
+            for seed, (_, _, output_node) in zip(seeds, traced):
+                output_node.adjoint = output_node.adjoint + seed
+
+            # compute adjoint for each node; the nodes were added in the
+            # order they were created, which is a topological order, and the
+            # inputs do not have parents
+            for node in reversed(added_nodes.values()):
+                for parent, partial in zip(node.parents, node.partials):
+                    parent.adjoint += node.adjoint * partial
+
+            # the chain-rule incorporated partials are stored as the input
+            # nodes' adjoints
+            adjoints = np.array([node.adjoint for node in inputs]).reshape(
+                len(inputs), k)
+            for j, (row, index, output_node) in enumerate(traced):
+                jacobian[row] = adjoints[:, j]
+
+                # record the computational graph for later points, unless a
+                # comparison of its nodes may take another branch there (the
+                # functions traced together share their table of nodes)
+                if added_nodes.branched:
+                    continue
+                tape = Tape(inputs, output_node)
+                self._tapes[row] = tape
+                self.computational_graph[index] = tape
 
         jacobian = np.array(jacobian)
         if jacobian.size == 1:
@@ -409,10 +532,149 @@ class AutoDiff:
 
         return jacobian
 
+    def get_jacobian_batch(self,
+                           points: Union[list, np.ndarray],
+                           mode="forward"):
+        """ compute the Jacobian matrix at many points at once; in forward mode the functions 
+            are evaluated once per input variable on dual numbers holding the values at all the 
+            points, so the elementary operations run as numpy array operations; in reverse mode 
+            the computational graph of each function is recorded at the first point and 
+            re-evaluated at all the points at once, the functions of a vector function in 
+            parallel threads when the graphs are large
+
+        Parameters
+        ----------
+        points: list or numpy ndarray
+            a 2-D sequence with one row of input values per point, or a 1-D sequence of 
+            scalar inputs
+        mode: {"forward", "f", "reverse", "r"}
+            option to perform automatic differentiation using forward or reverse mode; default is "forward"
+
+        Returns
+        -------
+        numpy ndarray 
+            the Jacobian matrices stacked along the first axis, with shape 
+            (number of points, number of functions, number of inputs)
+
+        Raises
+        ------
+        TypeError
+            If points is not a list or numpy ndarray or has incorrect dimension
+
+        ValueError 
+            If mode is not one of the accepted strings
+        """
+
+        if not isinstance(points, (list, np.ndarray)):
+            raise TypeError("Invalid input type")
+
+        if not isinstance(mode, str) or mode.lower() not in [
+                "forward", "f", "reverse", "r"
+        ]:
+            raise ValueError("Invalid mode")
+
+        points = self._as_numeric_array(points).astype(float)
+        if points.ndim not in (1, 2):
+            raise TypeError("Invalid input array dimension")
+
+        scalar = points.ndim == 1
+        if scalar:
+            points = points.reshape(-1, 1)
+        n_points, n_inputs = points.shape
+
+        if mode.lower() in ["reverse", "r"]:
+            return self._get_jacobian_batch_reverse(points, scalar)
+
+        jacobian = np.zeros((n_points, len(self.f), n_inputs))
+        try:
+            with np.errstate(all="raise"):
+                for j in range(n_inputs):
+                    # the variable to differentiate w.r.t. has dual parts of 1
+                    duals = [
+                        DualNumber(points[:, k], np.full(n_points, float(k == j)))
+                        for k in range(n_inputs)
+                    ]
+                    if scalar:
+                        point_dual = duals[0]
+                    else:
+                        point_dual = np.empty(n_inputs, dtype=object)
+                        point_dual[:] = duals
+
+                    for i, func in enumerate(self.f):
+                        if isinstance(func, (int, float)):
+                            continue
+                        val = func(point_dual)
+                        if isinstance(val, DualNumber):
+                            jacobian[:, i, j] = val.dual
+        except (TypeError, ValueError, ArithmeticError):
+            # functions that cannot run on arrays (e.g. they branch on the value of their input) 
+            # are differentiated one point at a time
+            for n, point in enumerate(points):
+                point = point.item() if scalar else point
+                jacobian[n] = self._get_jacobian_forward(point).reshape(
+                    len(self.f), n_inputs)
+
+        return jacobian
+
+    def _get_jacobian_batch_reverse(self, points: np.ndarray, scalar: bool):
+        """ computes the Jacobian matrices at many points using reverse mode """
+
+        n_points, n_inputs = points.shape
+        jacobian = np.zeros((n_points, len(self.f), n_inputs))
+        if n_points == 0:
+            return jacobian
+
+        def one_at_a_time():
+            for n, point in enumerate(points):
+                point = point.item() if scalar else point
+                jacobian[n] = self._get_jacobian_reverse(point).reshape(
+                    len(self.f), n_inputs)
+            return jacobian
+
+        # record the computational graph of each function at the first point
+        self._get_jacobian_reverse(
+            points[0, 0].item() if scalar else points[0])
+        tapes = []
+        for i, func in enumerate(self.f):
+            if not isinstance(func, (int, float)):
+                tape = self._tapes.get(i)
+                if tape is None or tape.n_inputs != n_inputs:
+                    # a function that branches on its input or returned a
+                    # real number has no tape, and is differentiated one
+                    # point at a time
+                    return one_at_a_time()
+                tapes += [(i, tape)]
+
+        def gradients(tape):
+            return tape.evaluate_many(points)[1]
+
+        work = n_points * sum(len(tape) for _, tape in tapes)
+        try:
+            if len(tapes) > 1 and work >= _PARALLEL_WORK:
+                # the numpy ufuncs on long arrays and the compiled reverse
+                # sweep release the GIL, so the tapes are re-evaluated in
+                # parallel
+                workers = min(len(tapes), os.cpu_count() or 1)
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    results = list(
+                        pool.map(gradients, [t for _, t in tapes]))
+            else:
+                results = [gradients(tape) for _, tape in tapes]
+        except FloatingPointError:
+            # a point is outside the domain of an operation; the points are
+            # differentiated one at a time, which raises as for that point
+            return one_at_a_time()
+
+        for (i, _), gradient in zip(tapes, results):
+            jacobian[:, i] = gradient
+
+        return jacobian
+
     def get_derivative(self,
                        point: Union[int, float, list, np.ndarray],
                        seed_vector=None,
-                       mode="forward"):
+                       mode="forward",
+                       out=None):
         """ calculate the directional derivative given point and the seed vector
 
         Parameters
@@ -423,11 +685,14 @@ class AutoDiff:
             a single or a sequence of numbers defining the seed of direction
         mode: {"forward", "f", "reverse", "r"}
             option to perform automatic differentiation using forward or reverse mode; default is "forward"
+        out: numpy ndarray, optional
+            a float array with one entry per function that the directional derivative is written into,
+            instead of a newly allocated array; it is the fast path for calling get_derivative in a loop
 
         Returns
         -------
         int, float, or numpy ndarray
-            the directional derivative based on the seed
+            the directional derivative based on the seed; out if it is given
 
         Raises 
         ------
@@ -456,21 +721,16 @@ class AutoDiff:
         else:
             seed_vector_arr = seed_vector
 
-        if isinstance(point, (int, float)):
-            point_arr = np.array([point])
-        elif isinstance(point, list):
-            point_arr = np.array(point)
-        else:
-            point_arr = point
+        n_point = 1 if isinstance(point, (int, float)) else len(point)
 
-        if len(point_arr) != len(seed_vector_arr):
+        if n_point != len(seed_vector_arr):
             if default_seed_vector == True:
                 raise ValueError(
                     f"You must provide a seed_vector when evaluating derivatives on a multivariate function."
                 )
             else:
                 raise ValueError(
-                    f"seed_vector is length {len(seed_vector_arr)}, and point is length: {len(point_arr)}. They must match."
+                    f"seed_vector is length {len(seed_vector_arr)}, and point is length: {n_point}. They must match."
                 )
 
         # check if the point are the same as last set of computed point
@@ -483,13 +743,28 @@ class AutoDiff:
             if ((isinstance(compare, bool) and compare
                  or isinstance(compare, np.ndarray) and compare.all())
                     and self.derivative is not None):
+                if out is not None:
+                    np.copyto(out, np.reshape(self.derivative, out.shape))
+                    return out
                 return self.derivative
 
-        self.jacobian = self.get_jacobian(point, mode)
+        if out is not None:
+            self.jacobian = self.get_jacobian(point, mode)
+            self.seed = seed_vector_arr
+
+            # the caller owns the buffer, so the derivative is not cached
+            np.matmul(self.jacobian.reshape(len(self.f), -1),
+                      seed_vector_arr,
+                      out=out)
+            self.derivative = None
+            return out
+
+        # the directional derivative is the only row of get_derivatives
+        derivative = self.get_derivatives(point,
+                                          seed_vector_arr.reshape(1, -1),
+                                          mode).reshape(-1, 1)
         self.seed = seed_vector_arr
 
-        derivative = np.dot(self.jacobian, seed_vector_arr.reshape(-1, 1))
-
         # if derivative.ndim == 1 and len(derivative) == 1:
         #     derivative = derivative[0]
 
@@ -503,3 +778,52 @@ class AutoDiff:
         self.derivative = derivative
         return self.derivative
 
+    def get_derivatives(self,
+                        point: Union[int, float, list, np.ndarray],
+                        seed_vectors: Union[list, np.ndarray],
+                        mode="forward"):
+        """ calculate the directional derivatives at point in the directions of many seed vectors, 
+            with the Jacobian matrix computed once and a single matrix product
+
+        Parameters
+        ----------
+        point: int, float, list, or numpy ndarray
+            a single or a sequence of numbers defining the point for the functions to evaluate at
+        seed_vectors: list or numpy ndarray
+            a 2-D sequence with one seed vector per row, or a 1-D sequence of scalar seeds for a 
+            function of a single input
+        mode: {"forward", "f", "reverse", "r"}
+            option to perform automatic differentiation using forward or reverse mode; default is "forward"
+
+        Returns
+        -------
+        numpy ndarray
+            the directional derivatives, with one row per seed vector and one column per function
+
+        Raises 
+        ------
+        TypeError
+            If point or seed_vectors is not of a valid type or has incorrect dimension
+        
+        ValueError 
+            If the seed vectors and point do not have the same length or mode is not one of the 
+            accepted strings
+        """
+
+        self._check_vector(point)
+        if not isinstance(seed_vectors, (list, np.ndarray)):
+            raise TypeError("Invalid input type")
+
+        n_point = 1 if isinstance(point, (int, float)) else len(point)
+        seeds = self._as_numeric_array(seed_vectors).astype(float)
+        if seeds.ndim == 1 and n_point == 1:
+            seeds = seeds.reshape(-1, 1)
+        if seeds.ndim != 2:
+            raise TypeError("Invalid input array dimension")
+        if seeds.shape[1] != n_point:
+            raise ValueError(
+                f"seed vectors are length {seeds.shape[1]}, and point is length: {n_point}. They must match."
+            )
+
+        jacobian = self.get_jacobian(point, mode)
+        return seeds @ jacobian.reshape(len(self.f), n_point).T
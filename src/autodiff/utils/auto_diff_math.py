@@ -1,9 +1,252 @@
 """Module containing overloaded functions to handle dual numbers and computational graph nodes."""
 
+import functools
 import math
 import numpy as np
 from autodiff.utils.dual_numbers import DualNumber
-from autodiff.utils.comp_graph import CompGraphNode
+from autodiff.utils.comp_graph import (CompGraphNode, FORMULAS, OP_IDS,
+                                       VECTOR_PARTIALS, VECTOR_VALUES)
+
+# the natural logarithms of the most recent bases given to exp_b and log_b
+# are kept; the cache is bounded, since the bases are arbitrary numbers
+@functools.lru_cache(maxsize=128)
+def _log_base(base):
+    """Returns the natural logarithm of a base, computed once per recent base.
+
+    Parameters
+    ----------
+    base : int or float
+        The base of an exponential or logarithm.
+
+    Returns
+    -------
+    float
+        The natural logarithm of the base.
+
+    """
+    return math.log(base)
+
+
+def _asin_partial(a):
+    """Returns the derivative of asin at a real number in [-1, 1].
+
+    Parameters
+    ----------
+    a : int or float
+        The argument of asin.
+
+    Returns
+    -------
+    float
+        1 / sqrt(1 - a**2), which is infinite at -1 and 1.
+
+    """
+    d = 1 - a**2
+    return 1 / math.sqrt(d) if d else math.inf
+
+
+def _vector_asin_partial(a):
+    """Returns the derivative of asin at an array of real numbers in [-1, 1],
+    infinite at -1 and 1 like _asin_partial, without raising or warning
+    about the division by zero there."""
+    with np.errstate(divide="ignore"):
+        return 1 / np.sqrt(1 - a**2)
+
+
+# value and partial derivative of each elementary function of a node, see
+# FORMULAS in comp_graph
+FORMULAS.update({
+    OP_IDS["sin"]: lambda a, b: (math.sin(a), (math.cos(a), )),
+    OP_IDS["cos"]: lambda a, b: (math.cos(a), (-math.sin(a), )),
+    OP_IDS["tan"]: lambda a, b: ((t := math.tan(a)), (1 + t * t, )),
+    OP_IDS["exp"]: lambda a, b: ((v := math.exp(a)), (v, )),
+    OP_IDS["exp_b"]: lambda a, b: ((v := b**a), (_log_base(b) * v, )),
+    OP_IDS["log"]: lambda a, b: (math.log(a), (1 / a, )),
+    OP_IDS["log_b"]:
+    lambda a, b: (math.log(a) / (lb := _log_base(b)), (1 / (a * lb), )),
+    OP_IDS["sinh"]: lambda a, b: ((v := math.sinh(a)), (math.hypot(1, v), )),
+    OP_IDS["cosh"]: lambda a, b: (math.cosh(a), (math.sinh(a), )),
+    OP_IDS["tanh"]: lambda a, b: ((t := math.tanh(a)), (1 - t * t, )),
+    OP_IDS["sqrt"]: lambda a, b: ((v := math.sqrt(a)), (0.5 / v, )),
+    OP_IDS["asin"]: lambda a, b: (math.asin(a), (_asin_partial(a), )),
+    OP_IDS["acos"]: lambda a, b: (math.acos(a), (-_asin_partial(a), )),
+    OP_IDS["atan"]: lambda a, b: (math.atan(a), (1 / (1 + a**2), )),
+    OP_IDS["logistic"]:
+    lambda a, b: ((v := 1 / (1 + math.exp(-a))), (v * (1 - v), )),
+    # sin(a) * cos(a) as 0.5 * sin(2a), see Tape
+    OP_IDS["sin_cos"]:
+    lambda a, b: (0.5 * math.sin(2 * a), (math.cos(2 * a), )),
+})
+
+# the same functions with numpy ufuncs, see VECTOR_VALUES and
+# VECTOR_PARTIALS in comp_graph
+VECTOR_VALUES.update({
+    OP_IDS["sin"]: lambda a, b: np.sin(a),
+    OP_IDS["cos"]: lambda a, b: np.cos(a),
+    OP_IDS["tan"]: lambda a, b: np.tan(a),
+    OP_IDS["exp"]: lambda a, b: np.exp(a),
+    OP_IDS["exp_b"]: lambda a, b: np.power(b, a),
+    OP_IDS["log"]: lambda a, b: np.log(a),
+    OP_IDS["log_b"]: lambda a, b: np.log(a) / np.log(b),
+    OP_IDS["sinh"]: lambda a, b: np.sinh(a),
+    OP_IDS["cosh"]: lambda a, b: np.cosh(a),
+    OP_IDS["tanh"]: lambda a, b: np.tanh(a),
+    OP_IDS["sqrt"]: lambda a, b: np.sqrt(a),
+    OP_IDS["asin"]: lambda a, b: np.arcsin(a),
+    OP_IDS["acos"]: lambda a, b: np.arccos(a),
+    OP_IDS["atan"]: lambda a, b: np.arctan(a),
+    OP_IDS["logistic"]: lambda a, b: 1 / (1 + np.exp(-a)),
+    OP_IDS["sin_cos"]: lambda a, b: 0.5 * np.sin(2 * a),
+})
+
+VECTOR_PARTIALS.update({
+    OP_IDS["sin"]: lambda a, b, v: [np.cos(a)],
+    OP_IDS["cos"]: lambda a, b, v: [-np.sin(a)],
+    OP_IDS["tan"]: lambda a, b, v: [1 + v * v],
+    OP_IDS["exp"]: lambda a, b, v: [v],
+    OP_IDS["exp_b"]: lambda a, b, v: [np.log(b) * v],
+    OP_IDS["log"]: lambda a, b, v: [1 / a],
+    OP_IDS["log_b"]: lambda a, b, v: [1 / (a * np.log(b))],
+    OP_IDS["sinh"]: lambda a, b, v: [np.hypot(1, v)],
+    OP_IDS["cosh"]: lambda a, b, v: [np.sinh(a)],
+    OP_IDS["tanh"]: lambda a, b, v: [1 - v * v],
+    OP_IDS["sqrt"]: lambda a, b, v: [0.5 / v],
+    OP_IDS["asin"]: lambda a, b, v: [_vector_asin_partial(a)],
+    OP_IDS["acos"]: lambda a, b, v: [-_vector_asin_partial(a)],
+    OP_IDS["atan"]: lambda a, b, v: [1 / (1 + a**2)],
+    OP_IDS["logistic"]: lambda a, b, v: [v * (1 - v)],
+    OP_IDS["sin_cos"]: lambda a, b, v: [np.cos(2 * a)],
+})
+
+
+def _dispatch(table, x, name):
+    """Returns the implementation of an elementary function for the type of x.
+
+    The functions look up the type of their argument in their table first
+    and only call this on a miss.
+
+    Parameters
+    ----------
+    table : dict
+        The implementation of the function for each supported type.
+    x : any
+        The argument of the function.
+    name : str
+        The name of the function, used in the error message.
+
+    Returns
+    -------
+    Callable
+        The implementation for the type of x (or for its closest supported
+        base class, which is then added to the table).
+
+    Raises
+    ------
+    TypeError
+        If x is not a int, float, DualNumber, or CompGraphNode
+
+    """
+    try:
+        return table[type(x)]
+    except KeyError:
+        for cls in type(x).__mro__:
+            if cls in table:
+                table[type(x)] = table[cls]
+                return table[cls]
+
+    raise TypeError(
+        "{}() only accepts int, float, DualNumber, or CompGraphNode.".format(
+            name))
+
+
+def _dual(op):
+    """Returns the DualNumber implementation of an elementary function.
+
+    DualNumbers holding numpy arrays are evaluated with the function's
+    ufuncs.
+
+    Parameters
+    ----------
+    op : str
+        The name of the function, with its formulas in FORMULAS,
+        VECTOR_VALUES and VECTOR_PARTIALS.
+
+    Returns
+    -------
+    Callable
+        The implementation for DualNumbers.
+
+    """
+    op_id = OP_IDS[op]
+    formula = FORMULAS[op_id]
+
+    def dual(x, base=None):
+        if isinstance(x.real, np.ndarray):
+            value = VECTOR_VALUES[op_id](x.real, base)
+            partial = VECTOR_PARTIALS[op_id](x.real, base, value)[0]
+        else:
+            value, (partial, ) = formula(x.real, base)
+        return DualNumber(value, partial * x.dual)
+
+    return dual
+
+
+def _node(op):
+    """Returns the CompGraphNode implementation of an elementary function.
+
+    Parameters
+    ----------
+    op : str
+        The name of the function, with its formula in FORMULAS.
+
+    Returns
+    -------
+    Callable
+        The implementation for CompGraphNodes.
+
+    """
+    op_id = OP_IDS[op]
+    return lambda x, base=None: x._apply(op_id, base)
+
+
+def _range_checked(func, attr=None):
+    """Wraps an inverse trigonometric function to reject values outside [-1, 1].
+
+    Parameters
+    ----------
+    func : Callable
+        The function to wrap.
+    attr : str, optional
+        The attribute of the argument holding its value; default is None
+        for real numbers.
+
+    Returns
+    -------
+    Callable
+        The wrapped function, raising a ValueError out of range.
+
+    """
+    def checked(x):
+        value = x if attr is None else getattr(x, attr)
+        # numpy is only called for arrays; on a real number np.any costs
+        # far more than the function itself
+        if isinstance(value, np.ndarray):
+            out_of_range = np.any(np.abs(value) > 1)
+        else:
+            out_of_range = value > 1 or value < -1
+        if out_of_range:
+            raise ValueError("Range of values must be -1 < x < 1")
+        return func(x)
+
+    return checked
+
+
+_SIN = {
+    int: math.sin,
+    float: math.sin,
+    CompGraphNode: _node("sin"),
+    DualNumber: _dual("sin"),
+}
 
 
 def sin(x):
@@ -25,26 +268,15 @@ def sin(x):
         If x is not a int, float, DualNumber, or CompGraphNode
     
     """
-    if isinstance(x, (int, float)):
-        return math.sin(x)
-
-    if isinstance(x, CompGraphNode):
-        if ("sin", x, None) in x._added_nodes:
-            return x._added_nodes.get(("sin", x, None))
+    return (_SIN.get(type(x)) or _dispatch(_SIN, x, "sin"))(x)
 
-        node = CompGraphNode(math.sin(x.value),
-                             parents=[x],
-                             partials=[math.cos(x.value)],
-                             added_nodes=x._added_nodes)
 
-        x._added_nodes[("sin", x, None)] = node
-        return node
-
-    if isinstance(x, DualNumber):
-        return DualNumber(math.sin(x.real), math.cos(x.real) * x.dual)
-
-    raise TypeError(
-        "sin() only accepts int, float, DualNumber, or CompGraphNode.")
+_COS = {
+    int: math.cos,
+    float: math.cos,
+    CompGraphNode: _node("cos"),
+    DualNumber: _dual("cos"),
+}
 
 
 def cos(x):
@@ -66,26 +298,15 @@ def cos(x):
         If x is not a int, float, DualNumber, or CompGraphNode
     
     """
-    if isinstance(x, (int, float)):
-        return math.cos(x)
-
-    if isinstance(x, CompGraphNode):
-        if ("cos", x, None) in x._added_nodes:
-            return x._added_nodes.get(("cos", x, None))
-
-        node = CompGraphNode(math.cos(x.value),
-                             parents=[x],
-                             partials=[-math.sin(x.value)],
-                             added_nodes=x._added_nodes)
-
-        x._added_nodes[("cos", x, None)] = node
-        return node
+    return (_COS.get(type(x)) or _dispatch(_COS, x, "cos"))(x)
 
-    if isinstance(x, DualNumber):
-        return DualNumber(math.cos(x.real), -math.sin(x.real) * x.dual)
 
-    raise TypeError(
-        "cos() only accepts int, float, DualNumber, or CompGraphNode.")
+_TAN = {
+    int: math.tan,
+    float: math.tan,
+    CompGraphNode: _node("tan"),
+    DualNumber: _dual("tan"),
+}
 
 
 def tan(x):
@@ -107,26 +328,15 @@ def tan(x):
         If x is not a int, float, DualNumber, or CompGraphNode
         
     """
-    if isinstance(x, (int, float)):
-        return math.tan(x)
-
-    if isinstance(x, CompGraphNode):
-        if ("tan", x, None) in x._added_nodes:
-            return x._added_nodes.get(("tan", x, None))
+    return (_TAN.get(type(x)) or _dispatch(_TAN, x, "tan"))(x)
 
-        node = CompGraphNode(math.tan(x.value),
-                             parents=[x],
-                             partials=[1 / (math.cos(x.value)**2)],
-                             added_nodes=x._added_nodes)
 
-        x._added_nodes[("tan", x, None)] = node
-        return node
-
-    if isinstance(x, DualNumber):
-        return DualNumber(math.tan(x.real),
-                          (1 / (math.cos(x.real)**2)) * x.dual)
-    raise TypeError(
-        "tan() only accepts int, float, DualNumber, or CompGraphNode.")
+_EXP = {
+    int: math.exp,
+    float: math.exp,
+    CompGraphNode: _node("exp"),
+    DualNumber: _dual("exp"),
+}
 
 
 def exp(x):
@@ -148,26 +358,15 @@ def exp(x):
         If x is not a int, float, DualNumber, or CompGraphNode
         
     """
-    if isinstance(x, (int, float)):
-        return math.exp(x)
-
-    if isinstance(x, CompGraphNode):
-        if ("exp", x, None) in x._added_nodes:
-            return x._added_nodes.get(("exp", x, None))
+    return (_EXP.get(type(x)) or _dispatch(_EXP, x, "exp"))(x)
 
-        node = CompGraphNode(math.exp(x.value),
-                             parents=[x],
-                             partials=[math.exp(x.value)],
-                             added_nodes=x._added_nodes)
 
-        x._added_nodes[("exp", x, None)] = node
-        return node
-
-    if isinstance(x, DualNumber):
-        return DualNumber(math.exp(x.real), math.exp(x.real) * x.dual)
-
-    raise TypeError(
-        "exp() only accepts int, float, DualNumber, or CompGraphNode.")
+_EXP_B = {
+    int: lambda x, base: base**x.real,
+    float: lambda x, base: base**x.real,
+    CompGraphNode: _node("exp_b"),
+    DualNumber: _dual("exp_b"),
+}
 
 
 def exp_b(x, base):
@@ -191,26 +390,15 @@ def exp_b(x, base):
         If x is not a int, float, DualNumber, or CompGraphNode
     
     """
-    if isinstance(x, (int, float)):
-        return base**x.real
-
-    if isinstance(x, CompGraphNode):
-        if ("exp_b", x, base) in x._added_nodes:
-            return x._added_nodes.get(("exp_b", x, base))
+    return (_EXP_B.get(type(x)) or _dispatch(_EXP_B, x, "exp_b"))(x, base)
 
-        node = CompGraphNode(base**x.value,
-                             parents=[x],
-                             partials=[math.log(base) * base**x.value],
-                             added_nodes=x._added_nodes)
 
-        x._added_nodes[("exp_b", x, base)] = node
-        return node
-
-    if isinstance(x, DualNumber):
-        return DualNumber(base**x.real, math.log(base) * base**x.real * x.dual)
-
-    raise TypeError(
-        "log() only accepts int, float, DualNumber, or CompGraphNode.")
+_LOG = {
+    int: math.log,
+    float: math.log,
+    CompGraphNode: _node("log"),
+    DualNumber: _dual("log"),
+}
 
 
 def log(x):
@@ -232,26 +420,15 @@ def log(x):
         If x is not a int, float, DualNumber, or CompGraphNode
     
     """
-    if isinstance(x, (int, float)):
-        return math.log(x)
+    return (_LOG.get(type(x)) or _dispatch(_LOG, x, "log"))(x)
 
-    if isinstance(x, CompGraphNode):
-        if ("log", x, None) in x._added_nodes:
-            return x._added_nodes.get(("log", x, None))
 
-        node = CompGraphNode(math.log(x.value),
-                             parents=[x],
-                             partials=[1 / x.value],
-                             added_nodes=x._added_nodes)
-
-        x._added_nodes[("log", x, None)] = node
-        return node
-
-    if isinstance(x, DualNumber):
-        return DualNumber(math.log(x.real), x.dual / x.real)
-
-    raise TypeError(
-        "log() only accepts int, float, DualNumber, or CompGraphNode.")
+_LOG_B = {
+    int: lambda x, base: math.log(x.real) / _log_base(base),
+    float: lambda x, base: math.log(x.real) / _log_base(base),
+    CompGraphNode: _node("log_b"),
+    DualNumber: _dual("log_b"),
+}
 
 
 def log_b(x, base):
@@ -278,28 +455,15 @@ def log_b(x, base):
     if not isinstance(base, (int, float)):
         raise TypeError("log_b() only accepts int or float as base.")
 
-    if isinstance(x, (int, float)):
-        return math.log(x.real) / math.log(base)
+    return (_LOG_B.get(type(x)) or _dispatch(_LOG_B, x, "log_b"))(x, base)
 
-    if isinstance(x, CompGraphNode):
-        if ("log_b", x, base) in x._added_nodes:
-            return x._added_nodes.get(("log_b", x, base))
 
-        node = CompGraphNode(math.log(x.value) / math.log(base),
-                             parents=[x],
-                             partials=[(1 / x.value) * (1 / math.log(base))],
-                             added_nodes=x._added_nodes)
-
-        x._added_nodes[("log_b", x, base)] = node
-        return node
-
-    if isinstance(x, DualNumber):
-        return DualNumber(
-            math.log(x.real) / math.log(base),
-            (1 / x.real) * (1 / math.log(base)) * x.dual)
-
-    raise TypeError(
-        "log() only accepts int, float, DualNumber, or CompGraphNode.")
+_SINH = {
+    int: math.sinh,
+    float: math.sinh,
+    CompGraphNode: _node("sinh"),
+    DualNumber: _dual("sinh"),
+}
 
 
 def sinh(x):
@@ -321,26 +485,15 @@ def sinh(x):
         If x is not a int, float, DualNumber, or CompGraphNode
     
     """
-    if isinstance(x, (int, float)):
-        return math.sinh(x)
-
-    if isinstance(x, CompGraphNode):
-        if ("sinh", x, None) in x._added_nodes:
-            return x._added_nodes.get(("sinh", x, None))
-
-        node = CompGraphNode(math.sinh(x.value),
-                             parents=[x],
-                             partials=[math.cosh(x.value)],
-                             added_nodes=x._added_nodes)
+    return (_SINH.get(type(x)) or _dispatch(_SINH, x, "sinh"))(x)
 
-        x._added_nodes[("sinh", x, None)] = node
-        return node
 
-    if isinstance(x, DualNumber):
-        return DualNumber(math.sinh(x.real), math.cosh(x.real) * x.dual)
-
-    raise TypeError(
-        "sinh() only accepts int, float, DualNumber, or CompGraphNode.")
+_COSH = {
+    int: math.cosh,
+    float: math.cosh,
+    CompGraphNode: _node("cosh"),
+    DualNumber: _dual("cosh"),
+}
 
 
 def cosh(x):
@@ -362,27 +515,15 @@ def cosh(x):
         If x is not a int, float, DualNumber, or CompGraphNode
     
     """
+    return (_COSH.get(type(x)) or _dispatch(_COSH, x, "cosh"))(x)
 
-    if isinstance(x, (int, float)):
-        return math.cosh(x)
-
-    if isinstance(x, CompGraphNode):
-        if ("cosh", x, None) in x._added_nodes:
-            return x._added_nodes.get(("cosh", x, None))
-
-        node = CompGraphNode(math.cosh(x.value),
-                             parents=[x],
-                             partials=[math.sinh(x.value)],
-                             added_nodes=x._added_nodes)
 
-        x._added_nodes[("cosh", x, None)] = node
-        return node
-
-    if isinstance(x, DualNumber):
-        return DualNumber(math.cosh(x.real), math.sinh(x.real) * x.dual)
-
-    raise TypeError(
-        "cosh() only accepts int, float, DualNumber, or CompGraphNode.")
+_TANH = {
+    int: math.tanh,
+    float: math.tanh,
+    CompGraphNode: _node("tanh"),
+    DualNumber: _dual("tanh"),
+}
 
 
 def tanh(x):
@@ -404,27 +545,15 @@ def tanh(x):
         If x is not a int, float, DualNumber, or CompGraphNode
     
     """
-    if isinstance(x, (int, float)):
-        return math.tanh(x)
+    return (_TANH.get(type(x)) or _dispatch(_TANH, x, "tanh"))(x)
 
-    if isinstance(x, CompGraphNode):
-        if ("tanh", x, None) in x._added_nodes:
-            return x._added_nodes.get(("tanh", x, None))
 
-        node = CompGraphNode(math.tanh(x.value),
-                             parents=[x],
-                             partials=[1 / (math.cosh(x.value)**2)],
-                             added_nodes=x._added_nodes)
-
-        x._added_nodes[("tanh", x, None)] = node
-        return node
-
-    if isinstance(x, DualNumber):
-        return DualNumber(math.tanh(x.real),
-                          (1 / (math.cosh(x.real)**2) * x.dual))
-
-    raise TypeError(
-        "tanh() only accepts int, float, DualNumber, or CompGraphNode.")
+_SQRT = {
+    int: math.sqrt,
+    float: math.sqrt,
+    CompGraphNode: _node("sqrt"),
+    DualNumber: _dual("sqrt"),
+}
 
 
 def sqrt(x):
@@ -446,27 +575,15 @@ def sqrt(x):
         If x is not a int, float, DualNumber, or CompGraphNode
         
     """
-    if isinstance(x, (int, float)):
-        return math.sqrt(x)
-
-    if isinstance(x, CompGraphNode):
-        if ("sqrt", x, None) in x._added_nodes:
-            return x._added_nodes.get(("sqrt", x, None))
-
-        node = CompGraphNode(math.sqrt(x.value),
-                             parents=[x],
-                             partials=[0.5 / math.sqrt(x.value)],
-                             added_nodes=x._added_nodes)
+    return (_SQRT.get(type(x)) or _dispatch(_SQRT, x, "sqrt"))(x)
 
-        x._added_nodes[("sqrt", x, None)] = node
-        return node
 
-    if isinstance(x, DualNumber):
-        return DualNumber(math.sqrt(x.real),
-                          (0.5 / math.sqrt(x.real)) * x.dual)
-
-    raise TypeError(
-        "sqrt() only accepts int, float, DualNumber, or CompGraphNode.")
+_ASIN = {
+    int: _range_checked(math.asin),
+    float: _range_checked(math.asin),
+    CompGraphNode: _range_checked(_node("asin"), "value"),
+    DualNumber: _range_checked(_dual("asin"), "real"),
+}
 
 
 def asin(x):
@@ -488,34 +605,15 @@ def asin(x):
         If x is not a int, float, DualNumber, or CompGraphNode
         
     """
+    return (_ASIN.get(type(x)) or _dispatch(_ASIN, x, "asin"))(x)
 
-    if isinstance(x, (int, float)):
-        if x > 1 or x < -1:
-            raise ValueError("Range of values must be -1 < x < 1")
-        return math.asin(x)
-
-    if isinstance(x, CompGraphNode):
-        if x.value > 1 or x.value < -1:
-            raise ValueError("Range of values must be -1 < x < 1")
-        if ("asin", x, None) in x._added_nodes:
-            return x._added_nodes.get(("asin", x, None))
 
-        node = CompGraphNode(math.asin(x.value),
-                             parents=[x],
-                             partials=[(1 / math.sqrt(1 - (x.value**2)))],
-                             added_nodes=x._added_nodes)
-
-        x._added_nodes[("asin", x, None)] = node
-        return node
-
-    if isinstance(x, DualNumber):
-        if x.real > 1 or x.real < -1:
-            raise ValueError("Range of values must be -1 < x < 1")
-        return DualNumber(np.arcsin(x.real),
-                          (1 / np.sqrt(1 - (x.real**2))) * x.dual)
-
-    raise TypeError(
-        "asin() only accepts int, float, DualNumber, or CompGraphNode.")
+_ACOS = {
+    int: _range_checked(math.acos),
+    float: _range_checked(math.acos),
+    CompGraphNode: _range_checked(_node("acos"), "value"),
+    DualNumber: _range_checked(_dual("acos"), "real"),
+}
 
 
 def acos(x):
@@ -537,33 +635,15 @@ def acos(x):
         If x is not a int, float, DualNumber, or CompGraphNode
         
     """
-    if isinstance(x, (int, float)):
-        if x > 1 or x < -1:
-            raise ValueError("Range of values must be -1 < x < 1")
-        return math.acos(x)
+    return (_ACOS.get(type(x)) or _dispatch(_ACOS, x, "acos"))(x)
 
-    if isinstance(x, CompGraphNode):
-        if x.value > 1 or x.value < -1:
-            raise ValueError("Range of values must be -1 < x < 1")
-        if ("acos", x, None) in x._added_nodes:
-            return x._added_nodes.get(("acos", x, None))
 
-        node = CompGraphNode(math.acos(x.value),
-                             parents=[x],
-                             partials=[-1 * (1 / math.sqrt(1 - x.value**2))],
-                             added_nodes=x._added_nodes)
-
-        x._added_nodes[("acos", x, None)] = node
-        return node
-
-    if isinstance(x, DualNumber):
-        if x.real > 1 or x.real < -1:
-            raise ValueError("Range of values must be -1 < x < 1")
-        return DualNumber(math.acos(x.real),
-                          -1 * (1 / math.sqrt(1 - x.real**2)) * x.dual)
-
-    raise TypeError(
-        "acos() only accepts int, float, DualNumber, or CompGraphNode.")
+_ATAN = {
+    int: math.atan,
+    float: math.atan,
+    CompGraphNode: _node("atan"),
+    DualNumber: _dual("atan"),
+}
 
 
 def atan(x):
@@ -585,25 +665,15 @@ def atan(x):
         If x is not a int, float, DualNumber, or CompGraphNode
         
     """
-    if isinstance(x, (int, float)):
-        return math.atan(x)
+    return (_ATAN.get(type(x)) or _dispatch(_ATAN, x, "atan"))(x)
 
-    if isinstance(x, CompGraphNode):
-        if ("atan", x, None) in x._added_nodes:
-            return x._added_nodes.get(("atan", x, None))
 
-        node = CompGraphNode(math.atan(x.value),
-                             parents=[x],
-                             partials=[1 / (1 + x.value**2)],
-                             added_nodes=x._added_nodes)
-
-        x._added_nodes[("atan", x, None)] = node
-        return node
-
-    if isinstance(x, DualNumber):
-        return DualNumber(math.atan(x.real), 1 / (1 + x.real**2) * x.dual)
-    raise TypeError(
-        "atan() only accepts int, float, DualNumber, or CompGraphNode.")
+_LOGISTIC = {
+    int: lambda x: 1 / (1 + math.exp(-x.real)),
+    float: lambda x: 1 / (1 + math.exp(-x.real)),
+    CompGraphNode: _node("logistic"),
+    DualNumber: _dual("logistic"),
+}
 
 
 def logistic(x):
@@ -624,28 +694,4 @@ def logistic(x):
     TypeError
         If x is not a int, float, DualNumber, or CompGraphNode
     """
-    if isinstance(x, (int, float)):
-        return 1 / (1 + math.exp(-x.real))
-
-    if isinstance(x, CompGraphNode):
-        if ("logistic", x, None) in x._added_nodes:
-            return x._added_nodes.get(("logistic", x, None))
-
-        node = CompGraphNode(1 / (1 + math.exp(-x.value)),
-                             parents=[x],
-                             partials=[(math.exp(x.value) /
-                                        ((math.exp(x.value) + 1) *
-                                         (math.exp(x.value) + 1)))],
-                             added_nodes=x._added_nodes)
-
-        x._added_nodes[("logistic", x, None)] = node
-        return node
-
-    if isinstance(x, DualNumber):
-        return DualNumber(1 / (1 + math.exp(-x.real)),
-                          (math.exp(x.real) /
-                           ((math.exp(x.real) + 1) *
-                            (math.exp(x.real) + 1))) * x.dual)
-
-    raise TypeError(
-        "logistic() only accepts int, float, DualNumber, or CompGraphNode.")
+    return (_LOGISTIC.get(type(x)) or _dispatch(_LOGISTIC, x, "logistic"))(x)
@@ -1,13 +1,176 @@
 """Module contains the node class for automatic differentiation."""
 
+import itertools
+import math
 import numpy as np
 
+# supported operations; they are interned to small ints so that the keys of
+# the table of added nodes are tuples of ints instead of strings and nodes
+OPS = ("add", "sub", "rsub", "mul", "div", "rdiv", "pow", "rpow", "neg", "sin",
+       "cos", "tan", "exp", "exp_b", "log", "log_b", "sinh", "cosh", "tanh",
+       "sqrt", "asin", "acos", "atan", "logistic", "sin_cos")
+
+# id of each operation with a constant (or without a) second operand
+OP_IDS = {op: i for i, op in enumerate(OPS)}
+
+# id of each operation with a node as second operand, kept apart from the
+# above so that e.g. node + 3 and node + (node with nid 3) never share a key
+NODE_OP_IDS = {op: i + len(OPS) for i, op in enumerate(OPS)}
+
+# ids of the arithmetic operations of nodes
+(_OP_ADD, _OP_SUB, _OP_RSUB, _OP_MUL, _OP_DIV, _OP_RDIV, _OP_POW, _OP_RPOW,
+ _OP_NEG) = (OP_IDS[op] for op in ("add", "sub", "rsub", "mul", "div", "rdiv",
+                                   "pow", "rpow", "neg"))
+
+# operations whose node operands are ordered by node id in the keys, so that
+# e.g. x * y and y * x are the same node
+_COMMUTATIVE = frozenset((_OP_ADD, _OP_MUL))
+
+
+def _log(x):
+    """Returns the natural logarithm of a real number with math.log, or with
+    numpy (nan or -inf, with a warning) instead of raising for x <= 0."""
+    return math.log(x) if x > 0 else np.log(x)
+
+
+# value and tuple of partial derivatives of each operation given the value
+# of the first operand and the value of the second operand (or the constant
+# argument of the operation); elementary functions register theirs in
+# auto_diff_math
+FORMULAS = {
+    OP_IDS["add"]: lambda a, b: (a + b, (1, )),
+    NODE_OP_IDS["add"]: lambda a, b: (a + b, (1, 1)),
+    OP_IDS["sub"]: lambda a, b: (a - b, (1, )),
+    NODE_OP_IDS["sub"]: lambda a, b: (a - b, (1, -1)),
+    OP_IDS["rsub"]: lambda a, b: (b - a, (-1, )),
+    OP_IDS["mul"]: lambda a, b: (a * b, (b, )),
+    NODE_OP_IDS["mul"]: lambda a, b: (a * b, (b, a)),
+    OP_IDS["div"]: lambda a, b: (a / b, (1 / b, )),
+    NODE_OP_IDS["div"]: lambda a, b: (a / b, (1 / b, -a / b**2)),
+    OP_IDS["rdiv"]: lambda a, b: ((v := b / a), (-v / a, )),
+    OP_IDS["pow"]: lambda a, b: (a**b, (b * a**(b - 1), )),
+    NODE_OP_IDS["pow"]:
+    lambda a, b: ((v := a**b), (b * a**(b - 1), v * _log(a))),
+    OP_IDS["rpow"]: lambda a, b: ((v := b**a), (v * _log(b), )),
+    OP_IDS["neg"]: lambda a, b: (-a, (-1, )),
+}
+
+# the same operations written with numpy ufuncs, so that they apply
+# elementwise to arrays of values: the value given the operands, and the
+# list of partial derivatives given the operands and the value
+VECTOR_VALUES = {
+    OP_IDS["add"]: lambda a, b: a + b,
+    NODE_OP_IDS["add"]: lambda a, b: a + b,
+    OP_IDS["sub"]: lambda a, b: a - b,
+    NODE_OP_IDS["sub"]: lambda a, b: a - b,
+    OP_IDS["rsub"]: lambda a, b: b - a,
+    OP_IDS["mul"]: lambda a, b: a * b,
+    NODE_OP_IDS["mul"]: lambda a, b: a * b,
+    OP_IDS["div"]: lambda a, b: a / b,
+    NODE_OP_IDS["div"]: lambda a, b: a / b,
+    OP_IDS["rdiv"]: lambda a, b: b / a,
+    OP_IDS["pow"]: np.power,
+    NODE_OP_IDS["pow"]: np.power,
+    OP_IDS["rpow"]: lambda a, b: np.power(b, a),
+    OP_IDS["neg"]: lambda a, b: -a,
+}
+
+VECTOR_PARTIALS = {
+    OP_IDS["add"]: lambda a, b, v: [1],
+    NODE_OP_IDS["add"]: lambda a, b, v: [1, 1],
+    OP_IDS["sub"]: lambda a, b, v: [1],
+    NODE_OP_IDS["sub"]: lambda a, b, v: [1, -1],
+    OP_IDS["rsub"]: lambda a, b, v: [-1],
+    OP_IDS["mul"]: lambda a, b, v: [b],
+    NODE_OP_IDS["mul"]: lambda a, b, v: [b, a],
+    OP_IDS["div"]: lambda a, b, v: [1 / b],
+    NODE_OP_IDS["div"]: lambda a, b, v: [1 / b, -a / b**2],
+    OP_IDS["rdiv"]: lambda a, b, v: [-v / a],
+    OP_IDS["pow"]: lambda a, b, v: [b * np.power(a, b - 1)],
+    NODE_OP_IDS["pow"]:
+    lambda a, b, v: [b * np.power(a, b - 1), v * np.log(a)],
+    OP_IDS["rpow"]: lambda a, b, v: [v * np.log(b)],
+    OP_IDS["neg"]: lambda a, b, v: [-1],
+}
+
+# monotonic node ids, unique across all computational graphs
+_nids = itertools.count()
+
+
+def node_key(op, node, other=None):
+    """Returns the key of the node computed by an operation.
+
+    Parameters
+    ----------
+    op : str
+        The name of the operation.
+    node : CompGraphNode
+        The first operand.
+    other : CompGraphNode or float or int, optional
+        The second operand or the constant argument of the operation
+        (e.g. the base of a logarithm); default is None.
+
+    Returns
+    -------
+    tuple
+        The key identifying the node in a table of added nodes.
+
+    """
+    if isinstance(other, CompGraphNode):
+        if OP_IDS[op] in _COMMUTATIVE and other.nid < node.nid:
+            node, other = other, node
+        return (NODE_OP_IDS[op], node.nid, other.nid)
+    return (OP_IDS[op], node.nid, other)
+
+
+class AddedNodes(dict):
+    """class AddedNodes
+
+    A dictionary of the nodes already added to a computational graph, keyed
+    by node_key. Looking up a missing key of the form (op, node, other), as
+    in ("sin", node, None), retries with the corresponding node_key.
+
+    branched is set when two nodes of the graph are compared: the function
+    traced may then apply other operations at other points, so its graph
+    must not be re-evaluated there.
+    """
+    branched = False
+
+    def __missing__(self, key):
+        """Looks up a key given in the (op, node, other) form.
+
+        Parameters
+        ----------
+        key : tuple
+            The missing key.
+
+        Returns
+        -------
+        CompGraphNode
+            The node stored under the corresponding node_key.
+
+        Raises
+        ------
+        KeyError
+            If no node is stored under the key.
+
+        """
+        if (isinstance(key, tuple) and len(key) == 3
+                and isinstance(key[0], str)
+                and isinstance(key[1], CompGraphNode)):
+            return self[node_key(*key)]
+        raise KeyError(key)
+
+
 class CompGraphNode:
     """class CompGraphNode
 
     A class for representing nodes, which are used for automatic
     differentiation.
     """
+    __slots__ = ("value", "parents", "partials", "adjoint", "nid",
+                 "_added_nodes")
+
     def __init__(self,
                  value,
                  parents=None,
@@ -20,13 +183,13 @@ class CompGraphNode:
         ----------
         value : float
             A a real number representing the value of the node.
-        parents : float, optional
+        parents : list or tuple, optional
             A list of reference to the node's parent nodes; default is None.
-        partials : float, optional
+        partials : list or tuple, optional
             a list of partial derivatives in the same order as the list parents; default is None.
         adjoint : float, optional
             The value of adjoint used in reverse pass.
-        added_nodes : float, optional
+        added_nodes : AddedNodes, optional
             A dictionary storing the nodes that have already been added to the computational graph; default is None.
 
         """
@@ -34,17 +197,18 @@ class CompGraphNode:
         self.value = value
 
         # each element of the lists (if not None) must be real number
-        assert (parents is None or isinstance(parents, list)
+        assert (parents is None or isinstance(parents, (list, tuple))
                 and sum([not isinstance(x, CompGraphNode)
                          for x in parents]) == 0)
 
-        assert (partials is None or isinstance(partials, list)
+        assert (partials is None or isinstance(partials, (list, tuple))
                 and sum([not isinstance(x, (int, float))
                          for x in partials]) == 0)
 
         # number of partial derivatives must match number of parents
         assert (parents is None and partials is None
-                or isinstance(parents, list) and isinstance(partials, list)
+                or isinstance(parents, (list, tuple))
+                and isinstance(partials, (list, tuple))
                 and len(parents) == len(partials))
 
         self.partials = partials
@@ -54,12 +218,60 @@ class CompGraphNode:
         assert isinstance(adjoint, (int, float))
         self.adjoint = adjoint
 
-        # dict of existing nodes identified by function (as str) and
-        # the passed values
+        # unique id of the node, used in the keys of added_nodes
+        self.nid = next(_nids)
+
+        # dict of existing nodes identified by the operation id and the
+        # operands (see node_key)
         if added_nodes is None:
-            added_nodes = {}
+            added_nodes = AddedNodes()
         self._added_nodes = added_nodes
 
+    def _apply(self, op, other=None):
+        """Applies an operation to the node, reusing an existing node if the
+        operation has already been added to the computational graph.
+
+        Parameters
+        ----------
+        op : int
+            The id of the operation in OP_IDS, with its formula in FORMULAS.
+        other : CompGraphNode or float or int, optional
+            The second operand or the constant argument of the operation;
+            default is None.
+
+        Returns
+        -------
+        CompGraphNode
+            The node computed by the operation.
+
+        """
+        # same key as node_key, without looking up the name of the operation
+        if isinstance(other, CompGraphNode):
+            if op in _COMMUTATIVE and other.nid < self.nid:
+                return other._apply(op, self)
+            key = (op + len(OPS), self.nid, other.nid)
+        else:
+            key = (op, self.nid, other)
+        node = self._added_nodes.get(key)
+        if node is not None:
+            return node
+
+        if isinstance(other, CompGraphNode):
+            value, partials = FORMULAS[key[0]](self.value, other.value)
+            parents = (self, other)
+        else:
+            value, partials = FORMULAS[key[0]](self.value, other)
+            parents = (self, )
+
+        node = CompGraphNode(value,
+                             parents=parents,
+                             partials=partials,
+                             added_nodes=self._added_nodes)
+
+        # add to existing nodes
+        self._added_nodes[key] = node
+        return node
+
     def __add__(self, other):
         """Addition operator for nodes.
 
@@ -81,25 +293,8 @@ class CompGraphNode:
             If the other operand is not a node or a real number.
 
         """
-        if ("add", self, other) in self._added_nodes:
-            return self._added_nodes.get(("add", self, other))
-
         if isinstance(other, (CompGraphNode, int, float)):
-            if isinstance(other, CompGraphNode):
-                node = CompGraphNode(self.value + other.value,
-                                     parents=[self, other],
-                                     partials=[1, 1],
-                                     added_nodes=self._added_nodes)
-
-            else:
-                node = CompGraphNode(self.value + other,
-                                     parents=[self],
-                                     partials=[1],
-                                     added_nodes=self._added_nodes)
-
-            # add to existing nodes
-            self._added_nodes[("add", self, other)] = node
-            return node
+            return self._apply(_OP_ADD, other)
 
         raise TypeError(
             "unsupported operand type(s) for +: '{}' and '{}'".format(
@@ -149,25 +344,8 @@ class CompGraphNode:
             If the other operand is not a node or a real number.
 
         """
-        if ("sub", self, other) in self._added_nodes:
-            return self._added_nodes.get(("sub", self, other))
-
         if isinstance(other, (CompGraphNode, int, float)):
-            if isinstance(other, CompGraphNode):
-                node = CompGraphNode(self.value - other.value,
-                                     parents=[self, other],
-                                     partials=[1, -1],
-                                     added_nodes=self._added_nodes)
-
-            else:
-                node = CompGraphNode(self.value - other,
-                                     parents=[self],
-                                     partials=[1],
-                                     added_nodes=self._added_nodes)
-
-            # add to existing nodes
-            self._added_nodes[("sub", self, other)] = node
-            return node
+            return self._apply(_OP_SUB, other)
 
         raise TypeError(
             "unsupported operand type(s) for +: '{}' and '{}'".format(
@@ -194,7 +372,12 @@ class CompGraphNode:
             If the other operand is not a node or a real number.
 
         """
-        return other + (-self)
+        if isinstance(other, (int, float)):
+            return self._apply(_OP_RSUB, other)
+
+        raise TypeError(
+            "unsupported operand type(s) for -: '{}' and '{}'".format(
+                type(other), type(self)))
 
     def __mul__(self, other):
         """Multiplication operator for nodes.
@@ -218,25 +401,8 @@ class CompGraphNode:
 
         """
 
-        if ("mul", self, other) in self._added_nodes:
-            return self._added_nodes.get(("mul", self, other))
-
         if isinstance(other, (CompGraphNode, int, float)):
-            if isinstance(other, CompGraphNode):
-                node = CompGraphNode(self.value * other.value,
-                                     parents=[self, other],
-                                     partials=[other.value, self.value],
-                                     added_nodes=self._added_nodes)
-
-            else:
-                node = CompGraphNode(self.value * other,
-                                     parents=[self],
-                                     partials=[other],
-                                     added_nodes=self._added_nodes)
-
-            # add to existing nodes
-            self._added_nodes[("mul", self, other)] = node
-            return node
+            return self._apply(_OP_MUL, other)
 
         raise TypeError(
             "unsupported operand type(s) for +: '{}' and '{}'".format(
@@ -287,25 +453,8 @@ class CompGraphNode:
             If the other operand is not a node or a real number.
         """
 
-        if ("div", self, other) in self._added_nodes:
-            return self._added_nodes.get(("div", self, other))
-
         if isinstance(other, (CompGraphNode, int, float)):
-            if isinstance(other, CompGraphNode):
-                node = CompGraphNode(self.value / other.value,
-                                     parents=[self, other],
-                                     partials=[1/other.value, -self.value/other.value**2],
-                                     added_nodes=self._added_nodes)
-
-            else:
-                node = CompGraphNode(self.value / other,
-                                     parents=[self],
-                                     partials=[1/other],
-                                     added_nodes=self._added_nodes)
-
-            # add to existing nodes
-            self._added_nodes[("div", self, other)] = node
-            return node
+            return self._apply(_OP_DIV, other)
 
         raise TypeError(
             "unsupported operand type(s) for +: '{}' and '{}'".format(
@@ -332,8 +481,12 @@ class CompGraphNode:
         TypeError
             If the other operand is not a node or a real number.
         """
+        if isinstance(other, (int, float)):
+            return self._apply(_OP_RDIV, other)
 
-        return other * (self**-1)
+        raise TypeError(
+            "unsupported operand type(s) for /: '{}' and '{}'".format(
+                type(other), type(self)))
 
     def __pow__(self, other):
         """Power operator for nodes.
@@ -356,28 +509,8 @@ class CompGraphNode:
             If the other operand is not a node or a real number.
         """
 
-        if ("pow", self, other) in self._added_nodes:
-            return self._added_nodes.get(("pow", self, other))
-
         if isinstance(other, (CompGraphNode, int, float)):
-            if isinstance(other, CompGraphNode):
-                node = CompGraphNode(self.value**other.value,
-                                     parents=[self, other],
-                                     partials=[
-                                       other.value * self.value**(other.value - 1),
-                                       self.value**other.value * np.log(self.value)
-                                     ],
-                                     added_nodes=self._added_nodes)
-
-            else:
-                node = CompGraphNode(self.value**other,
-                                     parents=[self],
-                                     partials=[other * self.value**(other - 1)],
-                                     added_nodes=self._added_nodes)
-
-            # add to existing nodes
-            self._added_nodes[("pow", self, other)] = node
-            return node
+            return self._apply(_OP_POW, other)
 
         raise TypeError(
             "unsupported operand type(s) for +: '{}' and '{}'".format(
@@ -404,13 +537,7 @@ class CompGraphNode:
         TypeError
             If the other operand is not a node or a real number.
         """
-        node = CompGraphNode(other**self.value,
-                                     parents=[self],
-                                     partials=[other**self.value*np.log(other)],
-                                     added_nodes=self._added_nodes)
-
-        self._added_nodes[("rpow", self, other)] = node
-        return node
+        return self._apply(_OP_RPOW, other)
 
     def __neg__(self):
         """Negation operator for nodes.
@@ -426,17 +553,139 @@ class CompGraphNode:
             The negated node.
 
         """
-        if ("neg", self, None) in self._added_nodes:
-            return self._added_nodes.get(("neg", self, None))
+        return self._apply(_OP_NEG)
 
-        node = CompGraphNode(-self.value,
-                             parents=[self],
-                             partials=[-1],
-                             added_nodes=self._added_nodes)
+    def __gt__(self, other):
+        """Greater than operator for nodes.
 
-        self._added_nodes[("neg", self, None)] = node
+        The values of the nodes are compared; no node is added to the graph,
+        since comparisons do not contribute to derivatives, but the graph is
+        marked as branched (see AddedNodes).
 
-        return node
+        Parameters
+        ----------
+        self : CompGraphNode
+            The first node.
+        other : CompGraphNode
+            The second node.
+
+        Returns
+        -------
+        bool
+            True if self greater than other, False otherwise.
+
+        Raises
+        ------
+        TypeError
+            If the other operand is not a node.
+
+        """
+        if isinstance(other, CompGraphNode):
+            self._added_nodes.branched = True
+            return self.value > other.value
+
+        raise TypeError(
+            "unsupported operand type(s) for >: '{}' and '{}'".format(
+                type(self), type(other)))
+
+    def __lt__(self, other):
+        """Less than operator for nodes.
+
+        The values of the nodes are compared; no node is added to the graph,
+        since comparisons do not contribute to derivatives, but the graph is
+        marked as branched (see AddedNodes).
+
+        Parameters
+        ----------
+        self : CompGraphNode
+            The first node.
+        other : CompGraphNode
+            The second node.
+
+        Returns
+        -------
+        bool
+            True if self less than other, False otherwise.
+
+        Raises
+        ------
+        TypeError
+            If the other operand is not a node.
+
+        """
+        if isinstance(other, CompGraphNode):
+            self._added_nodes.branched = True
+            return self.value < other.value
+
+        raise TypeError(
+            "unsupported operand type(s) for <: '{}' and '{}'".format(
+                type(self), type(other)))
+
+    def __ge__(self, other):
+        """Greater than or equal to operator for nodes.
+
+        The values of the nodes are compared; no node is added to the graph,
+        since comparisons do not contribute to derivatives, but the graph is
+        marked as branched (see AddedNodes).
+
+        Parameters
+        ----------
+        self : CompGraphNode
+            The first node.
+        other : CompGraphNode
+            The second node.
+
+        Returns
+        -------
+        bool
+            True if self greater than or equal to other, False otherwise.
+
+        Raises
+        ------
+        TypeError
+            If the other operand is not a node.
+
+        """
+        if isinstance(other, CompGraphNode):
+            self._added_nodes.branched = True
+            return self.value >= other.value
+
+        raise TypeError(
+            "unsupported operand type(s) for >=: '{}' and '{}'".format(
+                type(self), type(other)))
+
+    def __le__(self, other):
+        """Less than or equal to operator for nodes.
+
+        The values of the nodes are compared; no node is added to the graph,
+        since comparisons do not contribute to derivatives, but the graph is
+        marked as branched (see AddedNodes).
+
+        Parameters
+        ----------
+        self : CompGraphNode
+            The first node.
+        other : CompGraphNode
+            The second node.
+
+        Returns
+        -------
+        bool
+            True if self less than or equal to other, False otherwise.
+
+        Raises
+        ------
+        TypeError
+            If the other operand is not a node.
+
+        """
+        if isinstance(other, CompGraphNode):
+            self._added_nodes.branched = True
+            return self.value <= other.value
+
+        raise TypeError(
+            "unsupported operand type(s) for <=: '{}' and '{}'".format(
+                type(self), type(other)))
 
     def __repr__(self):
         """Representation of a node.
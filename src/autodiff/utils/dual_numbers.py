@@ -3,21 +3,29 @@
 import math
 import numpy as np
 
+# exact types of real numbers, checked before the isinstance calls; their
+# subclasses (e.g. bool or numpy float64) are still found by isinstance
+_REALS = frozenset((int, float))
+
 
 class DualNumber:
     """class DualNumber
 
     A class for representing dual numbers, which are used for automatic
-    differentiation.
+    differentiation. The real and dual parts may also be numpy arrays of the
+    same shape, in which case the dual number holds many dual numbers and
+    each operation applies to all of them with numpy ufuncs.
     """
+    __slots__ = ("real", "dual")
+
     def __init__(self, real, dual=1):
         """Constructs a DualNumber object.
 
         Parameters
         ----------
-        real : float
+        real : float or numpy ndarray
             The real part of the dual number.
-        dual : float, optional
+        dual : float or numpy ndarray, optional
             The dual part of the dual number. Defaults to 1.
 
         """
@@ -45,14 +53,13 @@ class DualNumber:
             If the other operand is not a dual number or a real number.
 
         """
-        if isinstance(other, DualNumber):
+        cls = type(other)
+        if cls is DualNumber or cls not in _REALS and isinstance(
+                other, DualNumber):
             return DualNumber(self.real + other.real, self.dual + other.dual)
-        elif isinstance(other, (int, float)):
+        elif cls in _REALS or isinstance(other, (int, float)):
             return DualNumber(self.real + other, self.dual)
-        else:
-            raise TypeError(
-                "unsupported operand type(s) for +: '{}' and '{}'".format(
-                    type(self), type(other)))
+        return NotImplemented
 
     def __radd__(self, other):
         """Addition operator for dual numbers.
@@ -98,14 +105,13 @@ class DualNumber:
             If the other operand is not a dual number or a real number.
 
         """
-        if isinstance(other, DualNumber):
+        cls = type(other)
+        if cls is DualNumber or cls not in _REALS and isinstance(
+                other, DualNumber):
             return DualNumber(self.real - other.real, self.dual - other.dual)
-        elif isinstance(other, (int, float)):
+        elif cls in _REALS or isinstance(other, (int, float)):
             return DualNumber(self.real - other, self.dual)
-        else:
-            raise TypeError(
-                "unsupported operand type(s) for -: '{}' and '{}'".format(
-                    type(self), type(other)))
+        return NotImplemented
 
     def __rsub__(self, other):
         """Subtraction operator for dual numbers.
@@ -151,15 +157,14 @@ class DualNumber:
             If the other operand is not a dual number or a real number.
 
         """
-        if isinstance(other, DualNumber):
+        cls = type(other)
+        if cls is DualNumber or cls not in _REALS and isinstance(
+                other, DualNumber):
             return DualNumber(self.real * other.real,
                               self.real * other.dual + self.dual * other.real)
-        elif isinstance(other, (int, float)):
+        elif cls in _REALS or isinstance(other, (int, float)):
             return DualNumber(self.real * other, self.dual * other)
-        else:
-            raise TypeError(
-                "unsupported operand type(s) for *: '{}' and '{}'".format(
-                    type(self), type(other)))
+        return NotImplemented
 
     def __rmul__(self, other):
         """Multiplication operator for dual numbers.
@@ -205,17 +210,16 @@ class DualNumber:
             If the other operand is not a dual number or a real number.
 
         """
-        if isinstance(other, DualNumber):
+        cls = type(other)
+        if cls is DualNumber or cls not in _REALS and isinstance(
+                other, DualNumber):
             return DualNumber(
                 self.real / other.real,
                 (self.dual * other.real - self.real * other.dual) /
                 (other.real**2))
-        elif isinstance(other, (int, float)):
+        elif cls in _REALS or isinstance(other, (int, float)):
             return DualNumber(self.real / other, self.dual / other)
-        else:
-            raise TypeError(
-                "unsupported operand type(s) for /: '{}' and '{}'".format(
-                    type(self), type(other)))
+        return NotImplemented
 
     def __rtruediv__(self, other):
         """Division operator for dual numbers.
@@ -263,23 +267,48 @@ class DualNumber:
             If the other operand is not a dual number with a non-zero dual part or a real number.
 
         """
-        if isinstance(other, DualNumber):
-            if self.dual != 0:
+        cls = type(other)
+        # exponents are nearly always integer constants, so they are
+        # checked before dual numbers
+        if cls is int and other >= 1:
+            # integer powers share one power of the real part between the
+            # value and the derivative, and squares need none; below 1 the
+            # shared power would be infinite at 0
+            if other == 2:
+                return DualNumber(self.real * self.real,
+                                  2 * self.real * self.dual)
+            power = self.real**(other - 1)
+            return DualNumber(power * self.real, other * power * self.dual)
+        elif cls is DualNumber or cls not in _REALS and isinstance(
+                other, DualNumber):
+            # the logarithm of the base is only needed when the exponent
+            # varies; np.any is only called for arrays, as for a number it
+            # costs more than the whole power
+            if (np.any(other.dual != 0) if isinstance(
+                    other.dual, np.ndarray) else other.dual != 0):
+                # numpy gives nan or -inf instead of raising for real <= 0,
+                # and takes the logarithm of arrays elementwise
+                log_real = (math.log(self.real)
+                            if not isinstance(self.real, np.ndarray)
+                            and self.real > 0 else np.log(self.real))
                 return DualNumber(
                     self.real**other.real,
                     self.real**(-1 + other.real) *
                     (self.dual * other.real +
-                     self.real * other.dual * np.log(self.real)))
+                     self.real * other.dual * log_real))
             return DualNumber(
                 self.real**other.real,
                 other.real * self.real**(other.real - 1) * self.dual)
-        elif isinstance(other, (int, float)):
+        elif cls in _REALS or isinstance(other, (int, float)):
+            if other == 0:
+                # constant; real**-1 would be infinite at 0
+                return DualNumber(
+                    self.real**0,
+                    np.zeros_like(self.dual) if isinstance(
+                        self.dual, np.ndarray) else 0)
             return DualNumber(self.real**other,
                               other * self.real**(other - 1) * self.dual)
-        else:
-            raise TypeError(
-                "unsupported operand type(s) for **: '{}' and '{}'".format(
-                    type(self), type(other)))
+        return NotImplemented
 
     def __rpow__(self, other):
         """Power operator for dual numbers.
@@ -337,7 +366,7 @@ class DualNumber:
             The representation of the dual number.
 
         """
-        return "DualNumber({}, {})".format(self.real, self.dual)
+        return "DualNumber(%r, %r)" % (self.real, self.dual)
 
     def __eq__(self, other):
         """Equality operator for dual numbers.
@@ -387,7 +416,11 @@ class DualNumber:
             If the other operand is not a dual number.
 
         """
-        return not self.__eq__(other)
+        if not isinstance(other, DualNumber):
+            raise TypeError(
+                "unsupported operand type(s) for !=: '{}' and '{}'".format(
+                    type(self), type(other)))
+        return self.real != other.real or self.dual != other.dual
 
     def __gt__(self, other):
         """Greater than operator for dual numbers.
@@ -412,10 +445,7 @@ class DualNumber:
         """
         if isinstance(other, DualNumber):
             return self.real > other.real
-        else:
-            raise TypeError(
-                "unsupported operand type(s) for >: '{}' and '{}'".format(
-                    type(self), type(other)))
+        return NotImplemented
 
     def __lt__(self, other):
         """Less than operator for dual numbers.
@@ -440,10 +470,7 @@ class DualNumber:
         """
         if isinstance(other, DualNumber):
             return self.real < other.real
-        else:
-            raise TypeError(
-                "unsupported operand type(s) for <: '{}' and '{}'".format(
-                    type(self), type(other)))
+        return NotImplemented
 
     def __ge__(self, other):
         """Greater than or equal to operator for dual numbers.
@@ -468,10 +495,7 @@ class DualNumber:
         """
         if isinstance(other, DualNumber):
             return self.real >= other.real
-        else:
-            raise TypeError(
-                "unsupported operand type(s) for >=: '{}' and '{}'".format(
-                    type(self), type(other)))
+        return NotImplemented
 
     def __le__(self, other):
         """Less than or equal to operator for dual numbers.
@@ -496,7 +520,309 @@ class DualNumber:
         """
         if isinstance(other, DualNumber):
             return self.real <= other.real
-        else:
-            raise TypeError(
-                "unsupported operand type(s) for <=: '{}' and '{}'".format(
-                    type(self), type(other)))
+        return NotImplemented
+
+
+class HyperDual:
+    """class HyperDual
+
+    A class for representing hyperdual numbers a + b e1 + c e2 + d e1e2,
+    with e1**2 = e2**2 = 0 and e1e2 != 0, which carry the first and second
+    derivatives of an expression through one evaluation. Seeding a variable
+    as HyperDual(x, 1, 1, 0) gives the value, the first derivative in eps1
+    and eps2, and the second derivative in eps12.
+    """
+    __slots__ = ("real", "eps1", "eps2", "eps12")
+
+    def __init__(self, real, eps1=1, eps2=1, eps12=0):
+        """Constructs a HyperDual object.
+
+        Parameters
+        ----------
+        real : float
+            The real part of the hyperdual number.
+        eps1 : float, optional
+            The e1 part of the hyperdual number. Defaults to 1.
+        eps2 : float, optional
+            The e2 part of the hyperdual number. Defaults to 1.
+        eps12 : float, optional
+            The e1e2 part of the hyperdual number. Defaults to 0.
+
+        """
+        self.real = real
+        self.eps1 = eps1
+        self.eps2 = eps2
+        self.eps12 = eps12
+
+    def _chain(self, value, first, second):
+        """Applies a function to a hyperdual number by the chain rule.
+
+        Parameters
+        ----------
+        self : HyperDual
+            The argument of the function.
+        value : float
+            The function at the real part.
+        first : float
+            The first derivative of the function at the real part.
+        second : float
+            The second derivative of the function at the real part.
+
+        Returns
+        -------
+        HyperDual
+            The function of the hyperdual number.
+
+        """
+        return HyperDual(value, first * self.eps1, first * self.eps2,
+                         first * self.eps12 + second * self.eps1 * self.eps2)
+
+    def __add__(self, other):
+        """Addition operator for hyperdual numbers.
+
+        Parameters
+        ----------
+        self : HyperDual
+            The first hyperdual number.
+        other : HyperDual or float or int
+            The second hyperdual number or a real number.
+
+        Returns
+        -------
+        HyperDual
+            The sum of the two numbers.
+
+        Raises
+        ------
+        TypeError
+            If the other operand is not a hyperdual number or a real number.
+
+        """
+        if isinstance(other, HyperDual):
+            return HyperDual(self.real + other.real, self.eps1 + other.eps1,
+                             self.eps2 + other.eps2,
+                             self.eps12 + other.eps12)
+        elif isinstance(other, (int, float)):
+            return HyperDual(self.real + other, self.eps1, self.eps2,
+                             self.eps12)
+        return NotImplemented
+
+    def __radd__(self, other):
+        """Addition operator for hyperdual numbers.
+
+        Parameters
+        ----------
+        self : HyperDual
+            The second hyperdual number.
+        other : float or int
+            The first real number.
+
+        Returns
+        -------
+        HyperDual
+            The sum of the two numbers.
+
+        """
+        return self + other
+
+    def __sub__(self, other):
+        """Subtraction operator for hyperdual numbers.
+
+        Parameters
+        ----------
+        self : HyperDual
+            The first hyperdual number.
+        other : HyperDual or float or int
+            The second hyperdual number or a real number.
+
+        Returns
+        -------
+        HyperDual
+            The difference of the two numbers.
+
+        Raises
+        ------
+        TypeError
+            If the other operand is not a hyperdual number or a real number.
+
+        """
+        if isinstance(other, (HyperDual, int, float)):
+            return self + (-other)
+        return NotImplemented
+
+    def __rsub__(self, other):
+        """Subtraction operator for hyperdual numbers.
+
+        Parameters
+        ----------
+        self : HyperDual
+            The second hyperdual number.
+        other : float or int
+            The first real number.
+
+        Returns
+        -------
+        HyperDual
+            The difference of the two numbers.
+
+        """
+        return -self + other
+
+    def __mul__(self, other):
+        """Multiplication operator for hyperdual numbers.
+
+        Parameters
+        ----------
+        self : HyperDual
+            The first hyperdual number.
+        other : HyperDual or float or int
+            The second hyperdual number or a real number.
+
+        Returns
+        -------
+        HyperDual
+            The product of the two numbers.
+
+        Raises
+        ------
+        TypeError
+            If the other operand is not a hyperdual number or a real number.
+
+        """
+        if isinstance(other, HyperDual):
+            return HyperDual(
+                self.real * other.real,
+                self.real * other.eps1 + self.eps1 * other.real,
+                self.real * other.eps2 + self.eps2 * other.real,
+                self.real * other.eps12 + self.eps1 * other.eps2 +
+                self.eps2 * other.eps1 + self.eps12 * other.real)
+        elif isinstance(other, (int, float)):
+            return HyperDual(self.real * other, self.eps1 * other,
+                             self.eps2 * other, self.eps12 * other)
+        return NotImplemented
+
+    def __rmul__(self, other):
+        """Multiplication operator for hyperdual numbers.
+
+        Parameters
+        ----------
+        self : HyperDual
+            The second hyperdual number.
+        other : float or int
+            The first real number.
+
+        Returns
+        -------
+        HyperDual
+            The product of the two numbers.
+
+        """
+        return self * other
+
+    def __truediv__(self, other):
+        """Division operator for hyperdual numbers.
+
+        Parameters
+        ----------
+        self : HyperDual
+            The first hyperdual number.
+        other : HyperDual or float or int
+            The second hyperdual number or a real number.
+
+        Returns
+        -------
+        HyperDual
+            The quotient of the two numbers.
+
+        Raises
+        ------
+        TypeError
+            If the other operand is not a hyperdual number or a real number.
+
+        """
+        if isinstance(other, HyperDual):
+            return self * other**-1
+        elif isinstance(other, (int, float)):
+            return self * (1 / other)
+        return NotImplemented
+
+    def __rtruediv__(self, other):
+        """Division operator for hyperdual numbers.
+
+        Parameters
+        ----------
+        self : HyperDual
+            The second hyperdual number.
+        other : float or int
+            The first real number.
+
+        Returns
+        -------
+        HyperDual
+            The quotient of the two numbers.
+
+        """
+        return other * self**-1
+
+    def __pow__(self, other):
+        """Power operator for hyperdual numbers.
+
+        Parameters
+        ----------
+        self : HyperDual
+            The hyperdual number.
+        other : float or int
+            The real exponent.
+
+        Returns
+        -------
+        HyperDual
+            The power of the hyperdual number.
+
+        Raises
+        ------
+        TypeError
+            If the exponent is not a real number.
+
+        """
+        if isinstance(other, (int, float)):
+            # the derivatives vanish for the exponents that zero their
+            # factor, which keeps them finite at a real part of 0
+            first = other * self.real**(other - 1) if other != 0 else 0
+            second = (other * (other - 1) * self.real**(other - 2)
+                      if other != 0 and other != 1 else 0)
+            return self._chain(self.real**other, first, second)
+        return NotImplemented
+
+    def __neg__(self):
+        """Negation operator for hyperdual numbers.
+
+        Parameters
+        ----------
+        self : HyperDual
+            The hyperdual number.
+
+        Returns
+        -------
+        HyperDual
+            The negated hyperdual number.
+
+        """
+        return HyperDual(-self.real, -self.eps1, -self.eps2, -self.eps12)
+
+    def __repr__(self):
+        """Representation of a hyperdual number.
+
+        Parameters
+        ----------
+        self : HyperDual
+            The hyperdual number.
+
+        Returns
+        -------
+        str
+            The representation of the hyperdual number.
+
+        """
+        return "HyperDual(%r, %r, %r, %r)" % (self.real, self.eps1, self.eps2,
+                                              self.eps12)
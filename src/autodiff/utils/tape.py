@@ -0,0 +1,319 @@
+"""Module contains the tape class for re-evaluating computational graphs."""
+
+import threading
+
+import numpy as np
+
+from autodiff.utils.comp_graph import (FORMULAS, NODE_OP_IDS, OP_IDS,
+                                       VECTOR_PARTIALS, VECTOR_VALUES)
+
+
+def reverse_sweep(arity, parents, partials, adjoints):
+    """Propagates the adjoints of the nodes of a tape to their parents, from
+    the last node to the first.
+
+    Parameters
+    ----------
+    arity : sequence of int
+        The number of parents of each node (0 for the inputs).
+    parents : sequence
+        The indices of the (up to two) parents of each node.
+    partials : sequence
+        The partial derivatives of each node with respect to its parents.
+    adjoints : list
+        The adjoint of each node, seeded at the output; updated in place.
+
+    """
+    for i in range(len(adjoints) - 1, -1, -1):
+        for j in range(arity[i]):
+            adjoints[parents[i][j]] += partials[i][j] * adjoints[i]
+
+
+def reverse_sweep_many(arity, parents, partials, adjoints):
+    """Propagates the adjoints of the nodes of a tape at many points to their
+    parents, from the last node to the first.
+
+    Parameters
+    ----------
+    arity : numpy ndarray
+        The number of parents of each node (0 for the inputs).
+    parents : numpy ndarray
+        The indices of the (up to two) parents of each node, as a 2-d array.
+    partials : numpy ndarray
+        The partial derivatives of each node with respect to its parents at
+        each point, as a 3-d array.
+    adjoints : numpy ndarray
+        The adjoint of each node at each point, seeded at the output, as a
+        2-d array; updated in place.
+
+    """
+    for i in range(adjoints.shape[0] - 1, -1, -1):
+        for j in range(arity[i]):
+            adjoints[parents[i, j]] += partials[i, j] * adjoints[i]
+
+
+def _reverse_sweep_many_loops(arity, parents, partials, adjoints):
+    """reverse_sweep_many with the loop over the points written out, so
+    that once compiled it does not allocate temporary arrays."""
+    for i in range(adjoints.shape[0] - 1, -1, -1):
+        for j in range(arity[i]):
+            parent = parents[i, j]
+            for k in range(adjoints.shape[1]):
+                adjoints[parent, k] += partials[i, j, k] * adjoints[i, k]
+
+
+# the sweep used by Tape.evaluate_many, set on its first call
+_sweep_many = None
+_sweep_many_lock = threading.Lock()
+
+
+def _get_sweep_many():
+    """Returns the reverse sweep at many points, compiled with numba if it is
+    installed.
+
+    numba is optional (the "numba" extra) and is only imported here, on the
+    first evaluation of a tape at many points, since importing it takes
+    longer than importing the whole package.
+
+    Returns
+    -------
+    Callable
+        The sweep, with the signature of reverse_sweep_many.
+
+    """
+    global _sweep_many
+    with _sweep_many_lock:
+        if _sweep_many is None:
+            try:
+                import numba
+            except ImportError:
+                # without numba the sweep runs in the interpreter
+                _sweep_many = reverse_sweep_many
+            else:
+                # the compiled sweep releases the GIL so that tapes can be
+                # swept in parallel threads
+                _sweep_many = numba.njit(cache=True, nogil=True)(
+                    _reverse_sweep_many_loops)
+    return _sweep_many
+
+
+_NODE_MUL = NODE_OP_IDS["mul"]
+_SIN, _COS, _SIN_COS = (OP_IDS[op] for op in ("sin", "cos", "sin_cos"))
+
+
+def _fuse(op, parents, records):
+    """Applies the peephole rules to a node of a tape.
+
+    A product of the sine and the cosine of the same node is replaced by a
+    single node computing 0.5 * sin(2x), which calls half as many
+    transcendental functions; the sine and cosine nodes are then dropped
+    from the tape unless something else depends on them.
+
+    Parameters
+    ----------
+    op : int
+        The op id of the node.
+    parents : tuple of int
+        The node ids of the parents of the node.
+    records : dict
+        The (op id, parents, constant argument) of each node recorded so
+        far, by node id; the inputs are not in it.
+
+    Returns
+    -------
+    tuple
+        The op id and the node ids of the parents of the rewritten node.
+
+    """
+    if op == _NODE_MUL and all(parent in records for parent in parents):
+        (op_a, parents_a, _), (op_b, parents_b, _) = (records[parent]
+                                                     for parent in parents)
+        if {op_a, op_b} == {_SIN, _COS} and parents_a == parents_b:
+            return _SIN_COS, parents_a
+    return op, parents
+
+
+class Tape:
+    """class Tape
+
+    A linear record of the computational graph of a function, used to
+    evaluate the function and its gradient at new points without tracing
+    the function again. The nodes are stored as a structure of arrays,
+    indexed by the position of the node on the tape (the inputs first).
+    """
+    def __init__(self, input_nodes, output_node):
+        """Constructs a Tape object from a traced computational graph.
+
+        Parameters
+        ----------
+        input_nodes : list of CompGraphNode
+            The input nodes the function was traced with.
+        output_node : CompGraphNode
+            The node returned by the function; it must share the dictionary
+            of added nodes with the input nodes.
+
+        """
+        # the dictionary of added nodes keeps the order in which the nodes
+        # were created, which is a topological order
+        records = {}
+        for key, node in output_node._added_nodes.items():
+            parents = tuple(parent.nid for parent in node.parents)
+            aux = key[2] if len(parents) == 1 else None
+            op, fused = _fuse(key[0], parents, records)
+            records[node.nid] = (op, fused, aux if fused == parents else None)
+
+        # only the nodes the output depends on are recorded
+        live = {output_node.nid}
+        entries = []
+        for nid, record in reversed(records.items()):
+            if nid in live:
+                live.update(record[1])
+                entries.append((nid, record))
+        entries.reverse()
+
+        index = {node.nid: i for i, node in enumerate(input_nodes)}
+        self.n_inputs = len(input_nodes)
+        n_nodes = self.n_inputs + len(entries)
+
+        # op id (-1 for the inputs), number of parents, indices of the
+        # parents and constant argument (nan if none) of each node; the
+        # indices are 32-bit so that the parents of a node fit in 8 bytes
+        self.op_ids = np.full(n_nodes, -1, dtype=np.int64)
+        self.arity = np.zeros(n_nodes, dtype=np.int8)
+        self.parents = np.zeros((n_nodes, 2), dtype=np.int32)
+        self.aux = np.full(n_nodes, np.nan)
+        for i, (nid, (op, parents, aux)) in enumerate(entries, self.n_inputs):
+            self.op_ids[i] = op
+            self.arity[i] = len(parents)
+            self.parents[i, :len(parents)] = [
+                index[parent] for parent in parents
+            ]
+            if aux is not None:
+                self.aux[i] = aux
+            index[nid] = i
+
+        self.output = index[output_node.nid]
+
+        # the same columns as lists, read by the interpreted passes
+        self._rows = list(
+            zip(range(self.n_inputs, n_nodes),
+                self.op_ids[self.n_inputs:].tolist(),
+                self.arity[self.n_inputs:].tolist(),
+                self.parents[self.n_inputs:].tolist(),
+                self.aux[self.n_inputs:].tolist()))
+        self._arity = self.arity.tolist()
+        self._parents = self.parents.tolist()
+
+        # nodes grouped by operation, as arrays of the indices of the nodes,
+        # of their first parents, and of their second parents or their
+        # constant arguments (as a column)
+        ops = self.op_ids[self.n_inputs:]
+        self.buckets = {}
+        for op in np.unique(ops).tolist():
+            nodes = np.flatnonzero(self.op_ids == op)
+            first = self.parents[nodes, 0]
+            if self.arity[nodes[0]] == 2:
+                second = self.parents[nodes, 1]
+            else:
+                second = self.aux[nodes].reshape(-1, 1)
+            self.buckets[op] = (nodes, first, second)
+
+    def __len__(self):
+        """Returns the number of nodes recorded, including the inputs."""
+        return len(self.op_ids)
+
+    def evaluate(self, point):
+        """Evaluates the recorded function and its gradient at a point.
+
+        Parameters
+        ----------
+        point : list
+            The value of each input, in the order of the input nodes.
+
+        Returns
+        -------
+        tuple or None
+            The value of the function and the list of its partial
+            derivatives with respect to each input, or None if the point is
+            outside the domain of a recorded operation; tracing the function
+            at the point then raises the same error as without the tape.
+
+        """
+        assert len(point) == self.n_inputs
+
+        # forward pass; the formulas raise, or return complex numbers for
+        # powers of negative numbers, where the nodes of a trace cannot be
+        # created
+        values = list(point) + [0] * (len(self) - self.n_inputs)
+        partials = [()] * len(values)
+        try:
+            for i, op, arity, (first, second), aux in self._rows:
+                other = values[second] if arity == 2 else aux
+                values[i], partials[i] = FORMULAS[op](values[first], other)
+        except (TypeError, ValueError, ArithmeticError):
+            return None
+        if complex in map(type, values):
+            return None
+
+        # reverse pass
+        adjoints = [0] * len(values)
+        adjoints[self.output] = 1
+        reverse_sweep(self._arity, self._parents, partials, adjoints)
+
+        return values[self.output], adjoints[:self.n_inputs]
+
+    def evaluate_many(self, points):
+        """Evaluates the recorded function and its gradient at many points.
+
+        The value of each node is computed for all the points at once, and
+        the partial derivatives of all the nodes of an operation with a
+        single call of its numpy ufunc.
+
+        Parameters
+        ----------
+        points : list or numpy ndarray
+            A 2-d sequence with one row of input values per point.
+
+        Returns
+        -------
+        tuple
+            The array of the values of the function at each point and the
+            2-d array of its gradient at each point (one row per point).
+
+        Raises
+        ------
+        FloatingPointError
+            If an operation is invalid or divides by zero at a point (e.g.
+            asin outside [-1, 1]), where evaluating the function at the
+            single point raises.
+
+        """
+        points = np.asarray(points)
+        assert points.dtype.kind in "biuf"
+        assert points.ndim == 2 and points.shape[1] == self.n_inputs
+        points = points.astype(float, copy=False)
+
+        with np.errstate(invalid="raise", divide="raise"):
+            # forward pass
+            values = np.empty((len(self), len(points)))
+            values[:self.n_inputs] = points.T
+            for i, op, arity, (first, second), aux in self._rows:
+                other = values[second] if arity == 2 else aux
+                values[i] = VECTOR_VALUES[op](values[first], other)
+
+            # partial derivatives, one operation at a time
+            partials = np.empty((len(self), 2, len(points)))
+            for op, (nodes, first, second) in self.buckets.items():
+                other = second
+                if second.ndim == 1:
+                    other = values[second]
+                for j, partial in enumerate(VECTOR_PARTIALS[op](
+                        values[first], other, values[nodes])):
+                    partials[nodes, j] = partial
+
+        # reverse pass
+        adjoints = np.zeros(values.shape)
+        adjoints[self.output] = 1
+        _get_sweep_many()(self.arity, self.parents, partials, adjoints)
+
+        return values[self.output], adjoints[:self.n_inputs].T
@@ -6,6 +6,7 @@ set -e
 tests=(
     test_dual_numbers.py
     test_comp_graph.py
+    test_tape.py
     test_auto_diff_math.py
     test_auto_diff.py
     test_auto_diff_rev.py
@@ -1,10 +1,13 @@
 import pytest
 import math
+from dataclasses import dataclass
 import numpy as np
 from pytest import approx
 
 # import names to test
+from autodiff import auto_diff
 from autodiff.auto_diff import AutoDiff
+from autodiff.utils.comp_graph import CompGraphNode
 from autodiff.utils.dual_numbers import DualNumber
 from autodiff.utils.auto_diff_math import *
 
@@ -331,6 +334,81 @@ class TestAutoDiff:
                         [h_p_0, h_p_1, h_p_2]])
         assert AutoDiff([f, g, h]).get_jacobian(x) == approx(res)
 
+    def test_get_jacobian_forward_rows(self):
+        # each function is evaluated once with vector dual parts
+        f = lambda x: exp(x[1]) * (-x[2]**(-1 / 2)) + x[0]**x[1]
+        g = lambda x: cos(x[0]) + log(x[1]) * x[2] / x[0]
+        ad = AutoDiff([f, g, 5])
+        x = [2, 10, 105.5]
+        jacobian = np.array([AutoDiff(func).get_jacobian(x, mode="r")
+                             for func in (f, g)]).reshape(2, 3)
+        assert ad.get_jacobian(x) == approx(np.vstack([jacobian, [0, 0, 0]]))
+
+        # functions comparing dual parts fall back to one coordinate at a time
+        h = lambda x: x[0] * x[1] if x[0] == x[1] else x[0]
+        assert AutoDiff(h).get_jacobian([2, 2]) == approx(np.array([[1, 0]]))
+
+    def test_get_jacobian_batch(self, monkeypatch):
+        # scalar function of scalar inputs
+        f = lambda x: -x + cos(x) * sin(x) + 5 * x**4 + logistic(x)
+        xs = np.array([0.5, 1.5, 2.0])
+        jac = AutoDiff(f).get_jacobian_batch(xs)
+        assert jac.shape == (3, 1, 1)
+        for x, j in zip(xs, jac):
+            assert j.flatten() == approx(AutoDiff(f).get_jacobian(x.item()))
+
+        # vector function with m=3 and a constant function
+        f = lambda x: exp(x[1]) * (-x[2]**(-1 / 2)) + asin(x[0] / 2)
+        g = lambda x: cos(x[0]) + log(x[1]) * x[2] / tanh(x[1])
+        h = 5
+        points = [[-1, 10, 105.5], [0.5, 2, 3], [1, 1, 1]]
+        jac = AutoDiff([f, g, h]).get_jacobian_batch(points)
+        assert jac.shape == (3, 3, 3)
+        for x, j in zip(points, jac):
+            assert j == approx(AutoDiff([f, g, h]).get_jacobian(x))
+
+        # powers with a varying exponent
+        power = lambda x: x[0]**x[1]
+        jac = AutoDiff(power).get_jacobian_batch([[2, 3], [1.5, 2]])
+        for x, j in zip([[2, 3], [1.5, 2]], jac):
+            assert j == approx(AutoDiff(power).get_jacobian(x))
+
+        # reverse mode, sequentially and in parallel threads
+        for work in [auto_diff._PARALLEL_WORK, 0]:
+            monkeypatch.setattr(auto_diff, "_PARALLEL_WORK", work)
+            ad = AutoDiff([f, g, h, lambda x: x[1]])
+            jac = ad.get_jacobian_batch(points, mode="r")
+            assert jac.shape == (3, 4, 3)
+            for x, j in zip(points, jac):
+                assert j == approx(ad.get_jacobian(x))
+        jac = AutoDiff(lambda x: x**2 * sin(x)).get_jacobian_batch(xs, "r")
+        assert jac.flatten() == approx(2 * xs * np.sin(xs) +
+                                       xs**2 * np.cos(xs))
+        with pytest.raises(ValueError):
+            AutoDiff(f).get_jacobian_batch(points, mode="s")
+
+        # functions that branch on their input fall back to single points
+        f = lambda x: x[0]**2 if x[0] > x[0] * 0 else x[1] * x[0]
+        points = [[-1, 3], [2, 3]]
+        jac = AutoDiff(f).get_jacobian_batch(points)
+        assert jac == approx(np.array([[[3, -1]], [[4, 0]]]))
+
+        # out of domain values raise as for single points
+        with pytest.raises(ValueError):
+            AutoDiff(lambda x: acos(x)).get_jacobian_batch([0.5, 2])
+        with pytest.raises(ValueError):
+            AutoDiff(lambda x: asin(x)).get_jacobian_batch([0.5, 2.0],
+                                                          mode="r")
+
+        # invalid input
+        with pytest.raises(TypeError):
+            AutoDiff(f).get_jacobian_batch(5)
+        with pytest.raises(TypeError):
+            AutoDiff(f).get_jacobian_batch(np.ones((2, 2, 2)))
+        for mode in ["f", "r"]:
+            with pytest.raises(TypeError):
+                AutoDiff(f).get_jacobian_batch([["1", "2"]], mode=mode)
+
     def test_get_derivative(self):
         # scalar function with m=1 and default_seed
         f = lambda x: -x + cos(x) * sin(x) + 5 * x**4
@@ -500,6 +578,81 @@ class TestAutoDiff:
         assert (AutoDiff([f, g, h]).get_derivative(x, p) == approx(
             np.dot(res, p.reshape(-1, 1))))
 
+    def test_constant_function(self):
+        calls = []
+
+        def h(x):
+            calls.append(x)
+            return 5
+
+        # a function returning a real number has a zero row, and is called
+        # once per evaluation
+        f = lambda x: x[0] * x[1]
+        ad = AutoDiff([f, h])
+        assert ad.get_jacobian([1, 2]) == approx(np.array([[2, 1], [0, 0]]))
+        assert len(calls) == 1
+        assert ad.get_partial([3, 4], 0) == approx([4, 0])
+        assert len(calls) == 2
+        assert ad.get_jacobian([3, 5], mode="r") == approx(
+            np.array([[5, 3], [0, 0]]))
+        assert ad.get_value([3, 4]) == [12, 5]
+        assert len(calls) == 4
+
+        ad = AutoDiff(h)
+        assert ad.get_jacobian(1, mode="r") == approx(0)
+        assert ad.get_jacobian(2) == approx(0)
+        assert ad.computational_graph == [None]
+
+        # a function returning a real number at one point is not assumed
+        # constant at the others
+        def g(x):
+            value = x.value if isinstance(x, CompGraphNode) else x.real
+            return 1.0 if value < 0 else x * x
+
+        for mode in ["f", "r"]:
+            ad = AutoDiff(g)
+            assert ad.get_jacobian(-1.0, mode=mode) == approx(0)
+            assert ad.get_jacobian(3.0, mode=mode) == approx(6)
+            assert ad.get_value(3.0) == 9
+        g = lambda x: 1.0 if x[0].real < 0 else x[0] * x[1]
+        jac = AutoDiff(g).get_jacobian_batch([[-1, 2], [3, 2]])
+        assert jac == approx(np.array([[[0, 0]], [[2, 3]]]))
+
+        # all the functions are constant, so the Jacobian is zero without
+        # evaluating anything
+        ad = AutoDiff([5, 2])
+        for mode in ["f", "r"]:
+            assert ad.get_jacobian([1, 2, 3], mode=mode) == approx(
+                np.zeros((2, 3)))
+            assert ad.get_jacobian(4, mode=mode) == approx(np.zeros((2, 1)))
+            assert ad.get_derivative([5, 6], [1, 1], mode=mode) == approx(
+                np.zeros((2, 1)))
+
+    def test_unhashable_function(self):
+        @dataclass
+        class Scaled:
+            scale: float
+
+            def __call__(self, x):
+                return self.scale * x[0] * x[1]
+
+        # dataclasses with eq=True are not hashable
+        f = Scaled(3.0)
+        with pytest.raises(TypeError):
+            hash(f)
+
+        ad = AutoDiff(f)
+        assert ad.get_value([2, 3]) == [18.0]
+        assert ad.get_partial([2, 3], 0) == approx([9])
+        assert ad.get_jacobian([2, 3]) == approx(np.array([[9, 6]]))
+        assert ad.get_jacobian([2, 4], mode="r") == approx(
+            np.array([[12, 6]]))
+        assert ad.get_jacobian([1, 4], mode="r") == approx(
+            np.array([[12, 3]]))
+        assert ad.get_jacobian_batch([[2, 3]], mode="r") == approx(
+            np.array([[[9, 6]]]))
+        assert ad.get_jacobian_batch([[2, 3]]) == approx(np.array([[[9, 6]]]))
+
     # test correct storage and calls of computed values (attributes of AutoDiff objects)
     def test_cache(self):
 
@@ -525,3 +678,61 @@ class TestAutoDiff:
         assert ad.get_jacobian(3) == 3.0
         # 10) call get_derivative with different point
         assert ad.get_derivative(4, [1]) == 4.0
+
+    def test_get_derivatives(self):
+        f = lambda x: exp(x[1]) * (-x[2]**(-1 / 2))
+        g = lambda x: cos(x[0]) + log(x[1]) * x[2]
+        h = lambda x: 5
+        x = np.array([10.2, 31, 0.055])
+        seeds = [[1, 1, 1], [1, 1, 0], [0, 2, -1]]
+        for mode in ["f", "r"]:
+            ad = AutoDiff([f, g, h])
+            derivatives = ad.get_derivatives(x, seeds, mode=mode)
+            assert derivatives.shape == (3, 3)
+            for seed, derivative in zip(seeds, derivatives):
+                assert derivative == approx(
+                    AutoDiff([f, g, h]).get_derivative(
+                        x, np.array(seed), mode=mode).flatten())
+
+        # function of a single input with scalar seeds
+        ad = AutoDiff([lambda x: x**2, lambda x: sin(x)])
+        assert ad.get_derivatives(2, [1, 3]) == approx(
+            np.array([[4, np.cos(2)], [12, 3 * np.cos(2)]]))
+
+        # invalid seeds
+        with pytest.raises(TypeError):
+            ad.get_derivatives(2, 3)
+        with pytest.raises(TypeError):
+            AutoDiff(f).get_derivatives(x, [1, 1, 1])
+        with pytest.raises(TypeError):
+            AutoDiff(f).get_derivatives(x, np.ones((1, 3, 1)))
+        with pytest.raises(TypeError):
+            AutoDiff(f).get_derivatives(x, [["1", "0", "0"]])
+        with pytest.raises(TypeError):
+            AutoDiff(f).get_derivatives(x, [[1, 0], [1, 0, 0]])
+        with pytest.raises(ValueError):
+            AutoDiff(f).get_derivatives(x, [[1, 1]])
+        with pytest.raises(ValueError):
+            AutoDiff(f).get_derivatives(x, seeds, mode="s")
+
+    def test_get_derivative_out(self):
+        f = lambda x: x[0] * sin(x[1])
+        g = lambda x: x[0] + x[1]**2
+        ad = AutoDiff([f, g])
+        out = np.empty(2)
+        x = np.array([1, math.pi])
+        p = np.array([1, 5])
+        for mode in ["f", "r"]:
+            assert ad.get_derivative(x, p, mode=mode, out=out) is out
+            assert out == approx([-5, 1 + 10 * math.pi])
+
+        # cached derivative
+        expected = ad.get_derivative(x, [2, 1]).flatten()
+        out[:] = 0
+        assert ad.get_derivative(x, [2, 1], out=out) is out
+        assert out == approx(expected)
+
+        # scalar function of a scalar
+        out = np.empty(1)
+        AutoDiff(lambda x: 1 / 2 * x**2).get_derivative(3, 2, out=out)
+        assert out[0] == 6.0
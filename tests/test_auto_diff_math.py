@@ -9,6 +9,8 @@ import numpy as np
 
 # import names to test
 from autodiff.utils.auto_diff_math import *
+from autodiff.utils.auto_diff_math import _log_base
+from autodiff.utils.comp_graph import OP_IDS
 
 
 class TestAutoDiffMath:
@@ -23,12 +25,16 @@ class TestAutoDiffMath:
 
         assert sin(z2) == math.sin(np.pi / 4)
 
+        # subclasses of the supported types, e.g. numpy floats
+        assert sin(np.float64(z2)) == math.sin(np.pi / 4)
+        assert sin(True) == math.sin(1)
+
         z4 = sin(z3)
         assert z4.value == math.sin(np.pi / 4)
         assert z4.parents[0] == z3
         assert z4.partials[0] == math.cos(np.pi / 4)
 
-        assert z4._added_nodes[("sin", z3, None)] == z4
+        assert z4._added_nodes[(OP_IDS["sin"], z3.nid, None)] == z4
         assert id(z4) == id(sin(z3))
 
         with pytest.raises(TypeError):
@@ -49,7 +55,7 @@ class TestAutoDiffMath:
         assert z4.parents[0] == z3
         assert z4.partials[0] == -math.sin(np.pi)
 
-        assert z4._added_nodes[("cos", z3, None)] == z4
+        assert z4._added_nodes[(OP_IDS["cos"], z3.nid, None)] == z4
         assert id(z4) == id(cos(z3))
 
         with pytest.raises(TypeError):
@@ -70,7 +76,7 @@ class TestAutoDiffMath:
         assert z4.parents[0] == z3
         assert z4.partials[0] == 1 / math.cos(np.pi)**2
 
-        assert z4._added_nodes[("tan", z3, None)] == z4
+        assert z4._added_nodes[(OP_IDS["tan"], z3.nid, None)] == z4
         assert id(z4) == id(tan(z3))
 
         with pytest.raises(TypeError):
@@ -91,7 +97,7 @@ class TestAutoDiffMath:
         assert z4.parents[0] == z3
         assert z4.partials[0] == np.e
 
-        assert z4._added_nodes[("exp", z3, None)] == z4
+        assert z4._added_nodes[(OP_IDS["exp"], z3.nid, None)] == z4
         assert id(z4) == id(exp(z3))
 
         with pytest.raises(TypeError):
@@ -112,7 +118,7 @@ class TestAutoDiffMath:
         assert z4.parents[0] == z3
         assert z4.partials[0] == 1 / 5
 
-        assert z4._added_nodes[("log", z3, None)] == z4
+        assert z4._added_nodes[(OP_IDS["log"], z3.nid, None)] == z4
         assert id(z4) == id(log(z3))
 
         with pytest.raises(TypeError):
@@ -133,7 +139,7 @@ class TestAutoDiffMath:
         assert z4.parents[0] == z3
         assert z4.partials[0] == pytest.approx(np.cosh(5))
 
-        assert z4._added_nodes[("sinh", z3, None)] == z4
+        assert z4._added_nodes[(OP_IDS["sinh"], z3.nid, None)] == z4
         assert id(z4) == id(sinh(z3))
 
         with pytest.raises(TypeError):
@@ -154,7 +160,7 @@ class TestAutoDiffMath:
         assert z4.parents[0] == z3
         assert z4.partials[0] == pytest.approx(np.sinh(5))
 
-        assert z4._added_nodes[("cosh", z3, None)] == z4
+        assert z4._added_nodes[(OP_IDS["cosh"], z3.nid, None)] == z4
         assert id(z4) == id(cosh(z3))
 
         with pytest.raises(TypeError):
@@ -175,7 +181,7 @@ class TestAutoDiffMath:
         assert z4.parents[0] == z3
         assert z4.partials[0] == 1 - np.tanh(0)**2
 
-        assert z4._added_nodes[("tanh", z3, None)] == z4
+        assert z4._added_nodes[(OP_IDS["tanh"], z3.nid, None)] == z4
         assert id(z4) == id(tanh(z3))
 
         with pytest.raises(TypeError):
@@ -196,9 +202,16 @@ class TestAutoDiffMath:
         assert z4.parents[0] == z3
         assert z4.partials[0] == 1 / np.sqrt(1 - 0.5**2)
 
-        assert z4._added_nodes[("asin", z3, None)] == z4
+        assert z4._added_nodes[(OP_IDS["asin"], z3.nid, None)] == z4
         assert id(z4) == id(asin(z3))
 
+        # the derivative is infinite at -1 and 1, in each implementation
+        assert asin(DualNumber(1.0)).dual == math.inf
+        assert asin(DualNumber(np.array([-1.0, 0.0]))).dual.tolist() == [
+            math.inf, 1.0
+        ]
+        assert asin(CompGraphNode(-1.0)).partials[0] == math.inf
+
         with pytest.raises(TypeError):
             asin("string")
 
@@ -235,9 +248,16 @@ class TestAutoDiffMath:
         assert z4.parents[0] == z3
         assert z4.partials[0] == -1 / np.sqrt(1 - 0.5**2)
 
-        assert z4._added_nodes[("acos", z3, None)] == z4
+        assert z4._added_nodes[(OP_IDS["acos"], z3.nid, None)] == z4
         assert id(z4) == id(acos(z3))
 
+        # the derivative is infinite at -1 and 1, in each implementation
+        assert acos(DualNumber(1.0)).dual == -math.inf
+        assert acos(DualNumber(np.array([-1.0, 0.0]))).dual.tolist() == [
+            -math.inf, -1.0
+        ]
+        assert acos(CompGraphNode(-1.0)).partials[0] == -math.inf
+
         with pytest.raises(TypeError):
             acos("string")
 
@@ -274,7 +294,7 @@ class TestAutoDiffMath:
         assert z4.parents[0] == z3
         assert z4.partials[0] == 1 / (1 + 0.5**2)
 
-        assert z4._added_nodes[("atan", z3, None)] == z4
+        assert z4._added_nodes[(OP_IDS["atan"], z3.nid, None)] == z4
         assert id(z4) == id(atan(z3))
 
         with pytest.raises(TypeError):
@@ -295,7 +315,7 @@ class TestAutoDiffMath:
         assert z4.parents[0] == z3
         assert z4.partials[0] == 1 / (4 * np.log(2))
 
-        assert z4._added_nodes[("log_b", z3, 2)] == z4
+        assert z4._added_nodes[(OP_IDS["log_b"], z3.nid, 2)] == z4
         assert id(z4) == id(log_b(z3, 2))
 
         with pytest.raises(TypeError):
@@ -304,6 +324,18 @@ class TestAutoDiffMath:
         with pytest.raises(TypeError):
             log_b(z1, "string")
 
+        # the logarithm of each recent base is computed once, and the cache
+        # stays bounded, even for nan bases that never compare equal
+        hits = _log_base.cache_info().hits
+        log_b(z2, 2)
+        assert _log_base.cache_info().hits == hits + 1
+        with pytest.raises(ValueError):
+            log_b(z2, -2)
+        for _ in range(200):
+            log_b(z2, float("nan"))
+        info = _log_base.cache_info()
+        assert info.currsize <= info.maxsize
+
     def test_exp_b(self):
         z1 = DualNumber(2)
         z2 = 2
@@ -319,7 +351,7 @@ class TestAutoDiffMath:
         assert z4.parents[0] == z3
         assert z4.partials[0] == 4 * np.log(2)
 
-        assert z4._added_nodes[("exp_b", z3, 2)] == z4
+        assert z4._added_nodes[(OP_IDS["exp_b"], z3.nid, 2)] == z4
         assert id(z4) == id(exp_b(z3, 2))
 
         with pytest.raises(TypeError):
@@ -340,7 +372,7 @@ class TestAutoDiffMath:
         assert z4.parents[0] == z3
         assert z4.partials[0] == 1 / (2 * np.sqrt(4))
 
-        assert z4._added_nodes[("sqrt", z3, None)] == z4
+        assert z4._added_nodes[(OP_IDS["sqrt"], z3.nid, None)] == z4
         assert id(z4) == id(sqrt(z3))
 
         with pytest.raises(TypeError):
@@ -361,7 +393,7 @@ class TestAutoDiffMath:
         assert z4.parents[0] == z3
         assert z4.partials[0] == 0.25
 
-        assert z4._added_nodes[("logistic", z3, None)] == z4
+        assert z4._added_nodes[(OP_IDS["logistic"], z3.nid, None)] == z4
         assert id(z4) == id(logistic(z3))
 
         with pytest.raises(TypeError):
@@ -7,6 +7,7 @@ from pytest import approx
 from autodiff.auto_diff import AutoDiff
 from autodiff.utils.dual_numbers import DualNumber
 from autodiff.utils.auto_diff_math import *
+from autodiff.utils import comp_graph
 
 
 class TestAutoDiffReverse:
@@ -28,9 +29,29 @@ class TestAutoDiffReverse:
         with pytest.raises(TypeError):
             x._check_vector([1, 2, "3"])
 
+        with pytest.raises(TypeError):
+            x._check_vector([[1, 2], [3]])
+
+        with pytest.raises(TypeError):
+            x._check_vector([[1, 2], [3, 4]])
+
+        x._check_vector([1, 2.5, True])
+
         with pytest.raises(TypeError):
             x._check_vector(np.array([1, 2, "3"]))
 
+        with pytest.raises(TypeError):
+            x._check_vector(np.array([1, 2, 3j]))
+
+        with pytest.raises(TypeError):
+            x._check_vector(np.array([1, 2, "3"], dtype=object))
+
+        with pytest.raises(TypeError):
+            x._check_vector(np.ones((2, 2)))
+
+        x._check_vector(np.array([1, 2, 3]))
+        x._check_vector(np.array([1.5, 2, 3], dtype=object))
+
     def test_get_value(self):
         x = AutoDiff(lambda x: x**2 - 2 * x)
         assert x.get_value(1) == -1
@@ -259,6 +280,129 @@ class TestAutoDiffReverse:
         assert (AutoDiff([f, g, h]).get_derivative(x, p, mode="r") == approx(
             np.dot(res, p.reshape(-1, 1))))
 
+    def test_reuse_graph(self):
+        f = lambda x: exp(x[1]) * (-x[2]**(-1 / 2))
+        g = lambda x: cos(x[0]) + log(x[1]) * x[2]
+        h = lambda x: 5
+        ad = AutoDiff([f, g, h])
+        ad.get_jacobian(np.array([-1, 10, 105.5]), mode="r")
+        tapes = ad.computational_graph
+        assert tapes[2] is None
+
+        # the graphs recorded on the first call are re-evaluated
+        x = [10.2, 31, 0.055]
+        jacobian = ad.get_jacobian(x, mode="r")
+        assert all(a is b for a, b in zip(ad.computational_graph, tapes))
+        assert jacobian == approx(AutoDiff([f, g, h]).get_jacobian(x))
+
+        # unless they are given a different number of inputs
+        ad = AutoDiff(g)
+        ad.get_jacobian(x, mode="r")
+        assert ad.get_jacobian([1, 2, 3, 4], mode="r") == approx(
+            np.array([[-np.sin(1), 3 / 2, np.log(2), 0]]))
+        assert ad.computational_graph[0].n_inputs == 4
+
+        # a new object traces its functions again
+        a = 2.0
+        h = lambda x: a * x
+        assert AutoDiff(h).get_jacobian(1.5, mode="r") == approx(2)
+        a = 3.0
+        ad = AutoDiff(h)
+        assert ad.get_jacobian(1.5, mode="r") == approx(3)
+        assert ad.computational_graph[0] is not tapes[0]
+
+    def test_numpy_scalars(self):
+        types = []
+
+        def f(x):
+            types.append(type(x[0].value))
+            return x[0] * x[1]
+
+        # numpy scalars are traced as Python numbers
+        x = [np.float64(2), np.float64(3)]
+        ad = AutoDiff(f)
+        assert ad.get_jacobian(x, mode="r") == approx(np.array([[3, 2]]))
+        assert ad.get_jacobian(x[::-1], mode="r") == approx(
+            np.array([[2, 3]]))
+        assert AutoDiff(lambda x: x**2).get_jacobian(
+            np.float64(3), mode="r") == approx(6)
+        assert types == [float]
+
+    def test_branching(self):
+        # functions comparing their inputs are traced again at each point
+        f = lambda x: x[0] * x[0] if x[0] > x[1] else x[1] * 3.0
+        ad = AutoDiff(f)
+        assert ad.get_jacobian([2, 1], mode="r") == approx(np.array([[4, 0]]))
+        assert ad.get_jacobian([1, 2], mode="r") == approx(np.array([[0, 3]]))
+        assert ad.computational_graph == [None]
+        jac = ad.get_jacobian_batch([[2, 1], [1, 2], [3, 1]], mode="r")
+        assert jac == approx(np.array([[[4, 0]], [[0, 3]], [[6, 0]]]))
+
+        # as are the functions traced with them
+        g = lambda x: x[0] * x[1]
+        ad = AutoDiff([g, f])
+        assert ad.get_jacobian([2, 1], mode="r") == approx(
+            np.array([[1, 2], [4, 0]]))
+        assert ad.get_jacobian([1, 2], mode="r") == approx(
+            np.array([[2, 1], [0, 3]]))
+
+        # functions returning a real number at the first point
+        h = lambda x: 1.0 if x[0].value < 0 else x[0] * x[1]
+        jac = AutoDiff(h).get_jacobian_batch([[-1, 2], [3, 2]], mode="r")
+        assert jac == approx(np.array([[[0, 0]], [[2, 3]]]))
+
+    def test_replay_domain(self):
+        # points outside the domain of the recorded graph raise as they do
+        # when the function is traced
+        ad = AutoDiff(lambda x: x**0.5)
+        assert ad.get_jacobian(4.0, mode="r") == approx(0.25)
+        with pytest.raises(AssertionError):
+            ad.get_jacobian(-4.0, mode="r")
+        assert ad.get_jacobian(9.0, mode="r") == approx(1 / 6)
+
+        ad = AutoDiff(lambda x: asin(x) * 2)
+        assert ad.get_jacobian(0.5, mode="r") == approx(2 / math.sqrt(0.75))
+        with pytest.raises(ValueError, match="Range of values"):
+            ad.get_jacobian(2.0, mode="r")
+
+        # the derivative is infinite at the bounds of the domain, when the
+        # graph is replayed at one point or at many
+        assert ad.get_jacobian(1.0, mode="r") == approx(math.inf)
+        jac = ad.get_jacobian_batch([0.5, -1.0], mode="r")
+        assert jac.ravel().tolist() == [2 / math.sqrt(0.75), math.inf]
+
+    def test_shared_graph(self):
+        f = lambda x: sin(x[0]) * x[1]
+        g = lambda x: sin(x[0]) + x[1]
+        ad = AutoDiff([f, g])
+        x = [0.3, 2]
+        first = next(comp_graph._nids)
+        assert ad.get_jacobian(x, mode="r") == approx(
+            AutoDiff([f, g]).get_jacobian(x))
+
+        # the two inputs and sin(x[0]) were built once for both functions
+        assert next(comp_graph._nids) - first - 1 == 5
+        x = [1.3, -2]
+        assert ad.get_jacobian(x, mode="r") == approx(
+            AutoDiff([f, g]).get_jacobian(x))
+
+        # the adjoints of all the functions are swept at once, including
+        # functions returning the same node or an input
+        h = lambda x: sin(x[0]) * x[1]
+        i = lambda x: x[1]
+        ad = AutoDiff([f, g, h, i, 3])
+        assert ad.get_jacobian(x, mode="r") == approx(
+            AutoDiff([f, g, h, i, 3]).get_jacobian(x))
+
+    def test_deep_graph(self):
+        # long chains are swept without recursion
+        def f(x):
+            for _ in range(5000):
+                x = x * 1.0001 + 0.5
+            return x
+
+        assert AutoDiff(f).get_jacobian(1, mode="r") == approx(1.0001**5000)
+
     def test_forward_reverse_match(self):
         # complicated scalar function with 1d input
         f = lambda x: 1 / x + x * x**2 - cos(1 / x) + sin(cos(1 / x)) - log_b(
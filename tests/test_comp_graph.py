@@ -6,7 +6,9 @@ of the autodiff package.
 import numpy as np
 import pytest
 
-from autodiff.utils.comp_graph import CompGraphNode
+from autodiff.utils.comp_graph import (AddedNodes, CompGraphNode, node_key,
+                                       _OP_ADD, _OP_SUB, _OP_RSUB, _OP_MUL,
+                                       _OP_DIV, _OP_RDIV, _OP_POW)
 
 
 class TestCompGraphNode:
@@ -39,6 +41,13 @@ class TestCompGraphNode:
         with pytest.raises(AssertionError):
             CompGraphNode(2, partials=[5], parents=[node, node2])
 
+        # nodes built by operations hold tuples and have no __dict__
+        node3 = node + node2
+        assert node3.parents == (node, node2)
+        assert node3.partials == (1, 1)
+        with pytest.raises(AttributeError):
+            node3.name = "node3"
+
     def test_addition(self):
         node = CompGraphNode(2)
         node2 = CompGraphNode(5)
@@ -68,7 +77,7 @@ class TestCompGraphNode:
         assert len(node5.partials) == 1
         assert len(node5._added_nodes.keys()) == 2
 
-        assert node5._added_nodes[("add", node, 3)] == node4
+        assert node5._added_nodes[(_OP_ADD, node.nid, 3)] == node4
         assert id(node5) == id(node4)
 
         # Handle Non-Supported Types (String)
@@ -96,7 +105,7 @@ class TestCompGraphNode:
         assert node3.partials[0] == 1
         assert len(node3._added_nodes.keys()) == 1
 
-        assert node3._added_nodes[("add", node, 3)] == node2
+        assert node3._added_nodes[(_OP_ADD, node.nid, 3)] == node2
         assert id(node2) == id(node3)
 
     def test_subtraction(self):
@@ -129,7 +138,7 @@ class TestCompGraphNode:
         print(node5._added_nodes)
         assert len(node5._added_nodes.keys()) == 2
 
-        assert node5._added_nodes[("sub", node, 3)] == node4
+        assert node5._added_nodes[(_OP_SUB, node.nid, 3)] == node4
         assert id(node5) == id(node4)
 
         # Handle Non-Supported Types (String)
@@ -146,8 +155,10 @@ class TestCompGraphNode:
         assert node2.adjoint == 0
         assert len(node2.parents) == 1
         assert len(node2.partials) == 1
-        print(node2._added_nodes)
-        assert len(node2._added_nodes) == 2
+        assert node2.partials[0] == -1
+        # a single node, without negating the node first
+        assert len(node2._added_nodes) == 1
+        assert node2._added_nodes[(_OP_RSUB, node.nid, 3)] == node2
 
         # float - CompGraphNode
         node3 = 3.0 - node
@@ -155,8 +166,11 @@ class TestCompGraphNode:
         assert node3.adjoint == 0
         assert len(node3.parents) == 1
         assert len(node3.partials) == 1
-        assert node3.partials[0] == 1
-        assert len(node3._added_nodes.keys()) == 2
+        assert node3.partials[0] == -1
+        assert len(node3._added_nodes.keys()) == 1
+
+        with pytest.raises(TypeError):
+            "string" - node
 
         print(node3._added_nodes)
         #assert node3._added_nodes[("add", 3, node)] == node2
@@ -192,7 +206,7 @@ class TestCompGraphNode:
         assert len(node5.partials) == 1
         assert len(node5._added_nodes.keys()) == 2
 
-        assert node5._added_nodes[("mul", node, 3)] == node4
+        assert node5._added_nodes[(_OP_MUL, node.nid, 3)] == node4
         assert id(node5) == id(node4)
 
         # Handle Non-Supported Types (String)
@@ -220,7 +234,7 @@ class TestCompGraphNode:
         assert node3.partials[0] == 3
         assert len(node3._added_nodes.keys()) == 1
 
-        assert node3._added_nodes[("mul", node, 3)] == node2
+        assert node3._added_nodes[(_OP_MUL, node.nid, 3)] == node2
         assert id(node2) == id(node3)
 
     def test_div(self):
@@ -253,7 +267,7 @@ class TestCompGraphNode:
         assert len(node5.partials) == 1
         assert len(node5._added_nodes.keys()) == 2
 
-        assert node5._added_nodes[("div", node, 3)] == node4
+        assert node5._added_nodes[(_OP_DIV, node.nid, 3)] == node4
         assert id(node5) == id(node4)
 
         # Handle Non-Supported Types (String)
@@ -270,8 +284,10 @@ class TestCompGraphNode:
         assert node2.adjoint == 0
         assert len(node2.parents) == 1
         assert len(node2.partials) == 1
-        assert node2.partials[0] == 3
-        assert len(node2._added_nodes) == 2
+        assert node2.partials[0] == -3 / 4
+        # a single node, without inverting the node first
+        assert len(node2._added_nodes) == 1
+        assert node2._added_nodes[(_OP_RDIV, node.nid, 3)] == node2
 
         # float / CompGraphNode
         node3 = 3.0 / node
@@ -279,11 +295,14 @@ class TestCompGraphNode:
         assert node3.adjoint == 0
         assert len(node3.parents) == 1
         assert len(node3.partials) == 1
-        assert node3.partials[0] == 3
-        assert len(node3._added_nodes.keys()) == 2
+        assert node3.partials[0] == -3 / 4
+        assert len(node3._added_nodes.keys()) == 1
 
         assert id(node2) == id(node3)
 
+        with pytest.raises(TypeError):
+            "string" / node
+
     def test_pow(self):
         node = CompGraphNode(2)
         node2 = CompGraphNode(5)
@@ -315,7 +334,7 @@ class TestCompGraphNode:
         assert len(node5.partials) == 1
         assert len(node5._added_nodes.keys()) == 2
 
-        assert node5._added_nodes[("pow", node, 3)] == node4
+        assert node5._added_nodes[(_OP_POW, node.nid, 3)] == node4
         assert id(node5) == id(node4)
 
         # Handle Non-Supported Types (String)
@@ -354,6 +373,62 @@ class TestCompGraphNode:
         assert node2.partials[0] == -1
         assert len(node2._added_nodes) == 1
 
+    def test_comparisons(self):
+        node = CompGraphNode(2)
+        node2 = CompGraphNode(3, added_nodes=node._added_nodes)
+        node3 = CompGraphNode(3, added_nodes=node._added_nodes)
+
+        assert node2 > node and not (node > node2)
+        assert node < node2 and not (node2 < node)
+        assert node3 >= node2 and not (node >= node2)
+        assert node3 <= node2 and not (node2 <= node)
+
+        # comparisons do not add nodes, but mark the graph as branched
+        assert len(node._added_nodes) == 0
+        assert node._added_nodes.branched
+        assert not (CompGraphNode(1) + 2)._added_nodes.branched
+
+        # Handle Int/Float Comparisons
+        for other in [2, 2.0]:
+            with pytest.raises(TypeError):
+                node < other
+            with pytest.raises(TypeError):
+                node > other
+            with pytest.raises(TypeError):
+                node <= other
+            with pytest.raises(TypeError):
+                node >= other
+
+    def test_added_nodes(self):
+        node = CompGraphNode(2)
+        node2 = CompGraphNode(3)
+
+        # nodes are identified by unique ids
+        assert node.nid != node2.nid
+
+        # a node operand and a constant operand never share a key
+        node3 = node + node2
+        node4 = node + node2.nid
+        assert node3 is not node4
+        assert len(node._added_nodes) == 2
+
+        assert node._added_nodes[("add", node, node2)] == node3
+        assert node._added_nodes[node_key("add", node, node2.nid)] == node4
+
+        with pytest.raises(KeyError):
+            node._added_nodes[("sub", node, node2)]
+
+        # commutative operations of nodes share a node in either order
+        added_nodes = AddedNodes()
+        x = CompGraphNode(2, added_nodes=added_nodes)
+        y = CompGraphNode(3, added_nodes=added_nodes)
+        assert y * x is x * y
+        assert y + x is x + y
+        assert y - x is not x - y
+        assert (y * x).parents == (x, y)
+        assert added_nodes[("mul", y, x)] is x * y
+        assert len(added_nodes) == 4
+
     def test_repr(self):
         node = CompGraphNode(2)
 
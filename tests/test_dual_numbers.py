@@ -3,12 +3,15 @@ This test suite (a module) runs tests for dual_numbers of the
 autodiff package.
 """
 
+import math
+import operator
+import pickle
 import pytest
 
 import numpy as np
 
 # import names to test
-from autodiff.utils.dual_numbers import DualNumber
+from autodiff.utils.dual_numbers import DualNumber, HyperDual
 
 
 class TestDualNumber:
@@ -18,185 +21,267 @@ class TestDualNumber:
         assert z1.real == 2
         assert z1.dual == 1
 
+        # no per-instance __dict__
+        with pytest.raises(AttributeError):
+            z1.name = "z1"
+
+        # slotted dual numbers can still be pickled, e.g. to send them to
+        # worker processes
+        z2 = pickle.loads(pickle.dumps(z1))
+        assert (z2.real, z2.dual) == (2, 1)
+
+    def test_arrays(self):
+        # dual numbers holding arrays apply each operation elementwise
+        z1 = DualNumber(np.array([1.0, 2.0, 3.0]), np.array([1.0, 0.0, 2.0]))
+        z2 = DualNumber(np.array([4.0, 5.0, 6.0]), np.ones(3))
+        z3 = 2 * z1 * z2 - z1 / z2 + z1**2 + 3**z2 + z1**z2
+        for i in range(3):
+            w1 = DualNumber(z1.real[i], z1.dual[i])
+            w2 = DualNumber(z2.real[i], z2.dual[i])
+            w3 = 2 * w1 * w2 - w1 / w2 + w1**2 + 3**w2 + w1**w2
+            assert z3.real[i] == pytest.approx(w3.real)
+            assert z3.dual[i] == pytest.approx(w3.dual)
+
+        # a constant base raised to a varying exponent
+        z4 = DualNumber(np.array([2.0, 3.0]), np.zeros(2))**DualNumber(
+            np.array([3.0, 2.0]), np.ones(2))
+        assert z4.dual == pytest.approx([8 * math.log(2), 9 * math.log(3)])
+        assert (DualNumber(2.0, 0)**DualNumber(3.0, 1)).dual == pytest.approx(
+            8 * math.log(2))
+
+        # array-valued and scalar dual numbers broadcast
+        w = DualNumber(2.0, 0.5)
+        z5 = (z1 * w - 1.5 / z2 + w / z1 - z2 + 4) / w
+        for i in range(3):
+            w1 = DualNumber(z1.real[i], z1.dual[i])
+            w2 = DualNumber(z2.real[i], z2.dual[i])
+            w5 = (w1 * w - 1.5 / w2 + w / w1 - w2 + 4) / w
+            assert z5.real[i] == pytest.approx(w5.real)
+            assert z5.dual[i] == pytest.approx(w5.dual)
+
     def test_addition(self):
         z1 = DualNumber(1, 2)
         z2 = DualNumber(5, 6)
 
         # DualNumber + DualNumber
-        assert (z1 + z2).real == 6
-        assert (z1 + z2).dual == 8
-        assert (z2 + z1).real == 6
-        assert (z2 + z1).dual == 8
+        result = z1 + z2
+        assert result.real == 6
+        assert result.dual == 8
+        result = z2 + z1
+        assert result.real == 6
+        assert result.dual == 8
 
         # DualNumber + int
-        assert (z1 + 3).real == 4
-        assert (z1 + 3).dual == 2
+        result = z1 + 3
+        assert result.real == 4
+        assert result.dual == 2
 
         # DualNumber + float
-        assert (z1 + 3.0).real == 4.0
-        assert (z1 + 3.0).dual == 2.0
+        result = z1 + 3.0
+        assert result.real == 4.0
+        assert result.dual == 2.0
 
-        # Handle Non-Supported Types (String)
-        with pytest.raises(TypeError):
-            z1 + "string"
-            "string" + z1
+    def test_augmented_assignment(self):
+        z1 = DualNumber(1, 2)
+        z2 = DualNumber(5, 6)
+
+        # augmented assignment rebinds instead of changing the dual number,
+        # which may also be a function input
+        acc = z1
+        acc += z2
+        acc *= z2
+        assert (z1.real, z1.dual) == (1, 2)
+        assert (acc.real, acc.dual) == (30, 76)
+        z3 = DualNumber(np.array([1.0, 2.0]), np.ones(2))
+        real = z3.real
+        z3 += z3
+        assert real == pytest.approx([1.0, 2.0])
 
     def test_reflective_addition(self):
         z1 = DualNumber(1, 2)
 
         # int + DualNumber
-        assert (z1 + 3).real == (3 + z1).real == 4
-        assert (z1 + 3).dual == (3 + z1).dual == 2
+        result = z1 + 3
+        reflected = 3 + z1
+        assert result.real == reflected.real == 4
+        assert result.dual == reflected.dual == 2
 
         # float + DualNumber
-        assert (z1 + 3.0).real == (3.0 + z1).real == 4.0
-        assert (z1 + 3.0).dual == (3.0 + z1).dual == 2.0
+        result = z1 + 3.0
+        reflected = 3.0 + z1
+        assert result.real == reflected.real == 4.0
+        assert result.dual == reflected.dual == 2.0
 
     def test_subtraction(self):
         z1 = DualNumber(1, 2)
         z2 = DualNumber(5, 6)
 
         # DualNumber + DualNumber
-        assert (z1 - z2).real == -4
-        assert (z1 - z2).dual == -4
-        assert (z2 - z1).real == 4
-        assert (z2 - z1).dual == 4
+        result = z1 - z2
+        assert result.real == -4
+        assert result.dual == -4
+        result = z2 - z1
+        assert result.real == 4
+        assert result.dual == 4
 
         # DualNumber + int
-        assert (z1 - 3).real == -2
-        assert (z1 - 3).dual == 2
+        result = z1 - 3
+        assert result.real == -2
+        assert result.dual == 2
 
         # DualNumber + float
-        assert (z1 - 3.0).real == -2.0
-        assert (z1 - 3.0).dual == 2
-
-        # Handle Non-Supported Types (String)
-        with pytest.raises(TypeError):
-            z1 - "string"
-            "string" - z1
+        result = z1 - 3.0
+        assert result.real == -2.0
+        assert result.dual == 2
 
     def test_reflective_subtraction(self):
         z1 = DualNumber(5, 5)
 
         # int - DualNumber
-        assert (1 - z1).real == -4
-        assert (1 - z1).dual == -5
+        result = 1 - z1
+        assert result.real == -4
+        assert result.dual == -5
 
         # float - DualNumber
-        assert (1.0 - z1).real == -4.0
-        assert (1.0 - z1).dual == -5.0
+        result = 1.0 - z1
+        assert result.real == -4.0
+        assert result.dual == -5.0
 
     def test_multiplication(self):
         z1 = DualNumber(1, 2)
         z2 = DualNumber(5, 6)
 
         # DualNumber * DualNumber
-        assert (z1 * z2).real == 5
-        assert (z1 * z2).dual == 16
-        assert (z2 * z1).real == 5
-        assert (z2 * z1).dual == 16
+        result = z1 * z2
+        assert result.real == 5
+        assert result.dual == 16
+        result = z2 * z1
+        assert result.real == 5
+        assert result.dual == 16
 
         # DualNumber * int
-        assert (z1 * 3).real == 3
-        assert (z1 * 3).dual == 6
+        result = z1 * 3
+        assert result.real == 3
+        assert result.dual == 6
 
         # DualNumber * float
-        assert (z1 * 3.0).real == 3.0
-        assert (z1 * 3.0).dual == 6.0
-
-        # Handle Non-Supported Types (String)
-        with pytest.raises(TypeError):
-            z1 * "string"
-            "string" * z1
+        result = z1 * 3.0
+        assert result.real == 3.0
+        assert result.dual == 6.0
 
     def test_reflective_multiplication(self):
         z1 = DualNumber(1, 2)
 
         # int * DualNumber
-        assert (z1 * 3).real == (3 * z1).real == 3
-        assert (z1 * 3).dual == (3 * z1).dual == 6
+        result = z1 * 3
+        reflected = 3 * z1
+        assert result.real == reflected.real == 3
+        assert result.dual == reflected.dual == 6
 
         # float * DualNumber
-        assert (z1 * 3.0).real == (3.0 * z1).real == 3.0
-        assert (z1 * 3.0).dual == (3.0 * z1).dual == 6.0
+        result = z1 * 3.0
+        reflected = 3.0 * z1
+        assert result.real == reflected.real == 3.0
+        assert result.dual == reflected.dual == 6.0
 
     def test_true_division(self):
         z1 = DualNumber(5, 5)
         z2 = DualNumber(1, 1)
 
         # DualNumber / DualNumber
-        assert (z1 / z2).real == 5
-        assert (z1 / z2).dual == 0
+        result = z1 / z2
+        assert result.real == 5
+        assert result.dual == 0
 
         # DualNumber / int
-        assert (z1 / 5).real == 1
-        assert (z1 / 5).dual == 1
+        result = z1 / 5
+        assert result.real == 1
+        assert result.dual == 1
 
         # DualNumber / float
-        assert (z1 / 5.0).real == 1.0
-        assert (z1 / 5.0).dual == 1.0
-
-        # Handle Non-Supported Types (String)
-        with pytest.raises(TypeError):
-            z1 / "string"
-            "string" / z1
+        result = z1 / 5.0
+        assert result.real == 1.0
+        assert result.dual == 1.0
 
     def test_reflective_true_division(self):
         z1 = DualNumber(5, 5)
 
         # int / DualNumber
-        assert (5 / z1).real == 1
-        assert (5 / z1).dual == -1
+        result = 5 / z1
+        assert result.real == 1
+        assert result.dual == -1
 
         # float / DualNumber
-        assert (5.0 / z1).real == 1.0
-        assert (5.0 / z1).dual == -1.0
+        result = 5.0 / z1
+        assert result.real == 1.0
+        assert result.dual == -1.0
 
     def test_power(self):
         z1 = DualNumber(5, 5)
 
         # DualNumber ** int
-        assert (z1**3).real == 125
-        assert (z1**3).dual == 375
+        result = z1**3
+        assert result.real == 125
+        assert result.dual == 375
+        for n in [-2, -1, 0, 1, 2, 4]:
+            result = z1**n
+            assert result.real == pytest.approx(5.0**n)
+            assert result.dual == pytest.approx(n * 5.0**(n - 1) * 5)
+        z4 = DualNumber(np.array([1.5, -2.0]), np.array([1.0, 3.0]))**3
+        assert z4.real == pytest.approx([1.5**3, -8])
+        assert z4.dual == pytest.approx([3 * 1.5**2, 36])
+        z4 = DualNumber(np.array([0.0, 2.0]), np.ones(2))**0
+        assert z4.real == pytest.approx([1, 1])
+        assert z4.dual == pytest.approx([0, 0])
+        result = DualNumber(0.0, 1.0)**0
+        assert (result.real, result.dual) == (1, 0)
 
         # DualNumber ** float
-        assert (z1**3.0).real == 125.0
-        assert (z1**3.0).dual == 375.0
-
-        # Handle Non-Supported Types (String)
-        with pytest.raises(TypeError):
-            z1**"string"
-            "string"**z1
+        result = z1**3.0
+        assert result.real == 125.0
+        assert result.dual == 375.0
+        for n in [0.5, 1.0, 2.0, 2.5]:
+            result = z1**n
+            assert result.real == pytest.approx(5.0**n)
+            assert result.dual == pytest.approx(n * 5.0**(n - 1) * 5)
+        result = DualNumber(0.0, 1.0)**1.5
+        assert (result.real, result.dual) == (0, 0)
 
         # Dual Number ** Dual Number
         z2 = DualNumber(1, 1)
         z3 = DualNumber(1, 0)
-        assert (z1**z2).real == 5
-        assert (z1**z2).dual == (5**0) * (1 * 5 + np.log(5) * 5 * 1)
-        assert (z3**z1).real == 1
-        assert (z3**z1).dual == 5 * 1**(5 - 1) * 0
+        result = z1**z2
+        assert result.real == 5
+        assert result.dual == (5**0) * (1 * 5 + np.log(5) * 5 * 1)
+        result = z3**z1
+        assert result.real == 1
+        assert result.dual == 5 * 1**(5 - 1) * 0
 
     def test_reflective_power(self):
         z1 = DualNumber(3, 3)
 
         # int * DualNumber
-        assert (2**z1).real == 8
-        assert (2**z1).dual == np.log(2) * 2**3 * 3
+        result = 2**z1
+        assert result.real == 8
+        assert result.dual == np.log(2) * 2**3 * 3
 
         # float * DualNumber
-        assert (2.0**z1).real == 8.0
-        assert (2.0**z1).dual == np.log(2.0) * 2.0**3.0 * 3.0
+        result = 2.0**z1
+        assert result.real == 8.0
+        assert result.dual == np.log(2.0) * 2.0**3.0 * 3.0
 
     def test_negation(self):
         z1 = DualNumber(5, 5)
         # -DualNumber
-        assert (-z1).real == -5
-        assert (-z1).dual == -5
+        result = -z1
+        assert result.real == -5
+        assert result.dual == -5
 
     def test_repr(self):
         z1 = DualNumber(5, 5)
         # repr(DualNumber)
         assert repr(z1) == 'DualNumber(5, 5)'
+        assert repr(DualNumber(0.1, 0.2)) == 'DualNumber(0.1, 0.2)'
 
     def test_equal(self):
         z1 = DualNumber(2, 2)
@@ -220,6 +305,11 @@ class TestDualNumber:
         # DualNumber != DualNumber
         assert z1 != z2
         assert not (z1 != z3)
+        assert z1 != DualNumber(3, 2)
+
+        # dual numbers are mutable, so they are not hashable
+        with pytest.raises(TypeError):
+            hash(z1)
 
         # Handle Int/Float Comparisons
         with pytest.raises(TypeError):
@@ -281,3 +371,101 @@ class TestDualNumber:
         with pytest.raises(TypeError):
             z1 <= 2
             z1 <= 2.0
+
+    def test_not_implemented(self):
+        z1 = DualNumber(1, 2)
+
+        # Unsupported types get to handle the operation themselves
+        class Other:
+            def __radd__(self, other):
+                return "radd"
+
+            def __rmul__(self, other):
+                return "rmul"
+
+            def __lt__(self, other):
+                return "lt"
+
+        assert z1 + Other() == "radd"
+        assert z1 * Other() == "rmul"
+        assert (z1 > Other()) == "lt"
+
+
+class TestHyperDual:
+    """Test class for hyperdual number types"""
+    def test_init(self):
+        x = HyperDual(2)
+        assert (x.real, x.eps1, x.eps2, x.eps12) == (2, 1, 1, 0)
+        assert repr(HyperDual(2, 1, 0, 0.5)) == 'HyperDual(2, 1, 0, 0.5)'
+
+        with pytest.raises(AttributeError):
+            x.name = "x"
+
+    def test_arithmetic(self):
+        x = HyperDual(5)
+
+        # f(x) = x**3, f' = 3x**2, f'' = 6x
+        for result in [x**3, x * x * x]:
+            assert result.real == 125
+            assert result.eps1 == result.eps2 == 75
+            assert result.eps12 == 30
+
+        # f(x) = 2 - x / 4 + 3 * x, f' = 2.75, f'' = 0
+        result = 2 - x / 4 + 3 * x
+        assert result.real == pytest.approx(15.75)
+        assert result.eps1 == result.eps2 == pytest.approx(2.75)
+        assert result.eps12 == 0
+
+        # f(x) = 1 / x, f' = -1 / x**2, f'' = 2 / x**3
+        result = 1 / x
+        assert result.real == pytest.approx(0.2)
+        assert result.eps1 == pytest.approx(-1 / 25)
+        assert result.eps12 == pytest.approx(2 / 125)
+
+        # f(x) = x**2 / (1 + x), f'' = 2 / (1 + x)**3
+        result = x**2 / (1 + x)
+        assert result.real == pytest.approx(25 / 6)
+        assert result.eps1 == pytest.approx(35 / 36)
+        assert result.eps12 == pytest.approx(2 / 216)
+
+        # f(x) = x**0.5, f'' = -x**-1.5 / 4
+        result = x**0.5
+        assert result.real == pytest.approx(math.sqrt(5))
+        assert result.eps12 == pytest.approx(-5**-1.5 / 4)
+
+        # powers stay finite at 0
+        for n, expected in [(0, (1, 0, 0)), (1, (0, 1, 0)), (2, (0, 0, 2))]:
+            result = HyperDual(0)**n
+            assert (result.real, result.eps1, result.eps12) == expected
+
+        result = x - HyperDual(1, 0, 0, 0)
+        assert (result.real, result.eps1, result.eps12) == (4, 1, 0)
+        result = -x
+        assert (result.real, result.eps1, result.eps12) == (-5, -1, 0)
+
+        # a hyperdual exponent is not supported
+        with pytest.raises(TypeError):
+            x**x
+
+    def test_mixed_partial(self):
+        # f(x, y) = x**2 * y with x seeded in e1 and y in e2, so eps12 is
+        # d2f / dx dy = 2x
+        x = HyperDual(2, 1, 0, 0)
+        y = HyperDual(3, 0, 1, 0)
+        result = x**2 * y
+        assert result.real == 12
+        assert result.eps1 == 12
+        assert result.eps2 == 4
+        assert result.eps12 == 4
+
+
+@pytest.mark.parametrize("number", [DualNumber(1, 2), HyperDual(1)])
+@pytest.mark.parametrize("op", [
+    operator.add, operator.sub, operator.mul, operator.truediv, operator.pow
+])
+def test_unsupported_types(number, op):
+    # Handle Non-Supported Types (String), on either side
+    with pytest.raises(TypeError):
+        op(number, "string")
+    with pytest.raises(TypeError):
+        op("string", number)
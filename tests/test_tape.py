@@ -0,0 +1,137 @@
+"""
+This test suite (a module) runs tests for the tape of the
+autodiff package.
+"""
+
+import math
+import numpy as np
+import pytest
+
+from autodiff.utils.comp_graph import OP_IDS, AddedNodes, CompGraphNode
+from autodiff.utils.auto_diff_math import *
+from autodiff.utils.tape import (Tape, _get_sweep_many, reverse_sweep,
+                                 reverse_sweep_many)
+
+
+class TestTape:
+    """Test class for Tape"""
+    def trace(self, func, point):
+        added_nodes = AddedNodes()
+        input_nodes = [CompGraphNode(p, added_nodes=added_nodes) for p in point]
+        return input_nodes, func(input_nodes)
+
+    def test_init(self):
+        f = lambda x: x[0] * sin(x[1]) + 3
+        input_nodes, output_node = self.trace(f, [1, 2])
+
+        tape = Tape(input_nodes, output_node)
+        assert tape.n_inputs == 2
+        assert len(tape) == 5
+        assert tape.output == 4
+        assert tape.arity.tolist() == [0, 0, 1, 2, 1]
+        assert tape.parents.dtype == np.int32
+        assert tape.parents[2:].tolist() == [[1, 0], [0, 2], [3, 0]]
+        assert np.isnan(tape.aux[2]) and tape.aux[4] == 3
+
+        # nodes the output does not depend on are not recorded
+        g = lambda x: [cos(x[0]), x[0] * x[1]][1]
+        input_nodes, output_node = self.trace(g, [1, 2])
+        assert len(output_node._added_nodes) == 2
+        assert len(Tape(input_nodes, output_node)) == 3
+
+        # output is an input
+        input_nodes, output_node = self.trace(lambda x: x[1], [1, 2])
+        tape = Tape(input_nodes, output_node)
+        assert len(tape) == 2
+        assert tape.evaluate([3, 4]) == (4, [0, 1])
+
+    def test_fuse(self):
+        f = lambda x: -x[0] + cos(x[0]) * sin(x[0]) + sin(x[0]) * cos(x[1])
+        input_nodes, output_node = self.trace(f, [1, 2])
+        tape = Tape(input_nodes, output_node)
+
+        # cos(x0) * sin(x0) is a single node, sin(x0) is kept for the other
+        # product and cos(x0) is dropped
+        assert len(output_node._added_nodes) == 8
+        assert len(tape) == 9
+        assert tape.op_ids.tolist().count(OP_IDS["sin_cos"]) == 1
+
+        value, gradient = tape.evaluate([0.5, 2])
+        assert value == pytest.approx(
+            -0.5 + math.cos(0.5) * math.sin(0.5) + math.sin(0.5) * math.cos(2))
+        assert gradient[0] == pytest.approx(
+            -1 + math.cos(1) + math.cos(0.5) * math.cos(2))
+        assert gradient[1] == pytest.approx(-math.sin(0.5) * math.sin(2))
+
+        values, gradients = tape.evaluate_many([[0.5, 2]])
+        assert values[0] == pytest.approx(value)
+        assert gradients[0] == pytest.approx(gradient)
+
+    def test_evaluate(self):
+        f = lambda x: x[0] * sin(x[1]) - log_b(x[0], 2) / x[1]**2
+        input_nodes, output_node = self.trace(f, [1, 2])
+        tape = Tape(input_nodes, output_node)
+
+        value, gradient = tape.evaluate([4, 0.5])
+        assert value == pytest.approx(4 * math.sin(0.5) - 2 / 0.25)
+        assert gradient[0] == pytest.approx(
+            math.sin(0.5) - 1 / (4 * math.log(2) * 0.25))
+        assert gradient[1] == pytest.approx(4 * math.cos(0.5) + 2 * 2 / 0.5**3)
+
+        with pytest.raises(AssertionError):
+            tape.evaluate([1])
+
+        # outside the domain of an operation there is no result
+        input_nodes, output_node = self.trace(lambda x: sqrt(x[0]) + x[0]**0.5,
+                                              [4])
+        tape = Tape(input_nodes, output_node)
+        assert tape.evaluate([9])[0] == pytest.approx(6)
+        assert tape.evaluate([-4]) is None
+
+    def test_evaluate_many(self):
+        f = lambda x: (x[0] * sin(x[1]) - log_b(x[0], 2) / x[1]**2 + sin(
+            x[0]) + exp(x[1]) * x[1] - 3**x[0] + sqrt(x[0]) + logistic(x[1]))
+        input_nodes, output_node = self.trace(f, [1, 2])
+        tape = Tape(input_nodes, output_node)
+
+        # nodes are grouped by operation
+        n_ops = len(tape) - tape.n_inputs
+        assert sum(len(nodes) for nodes, _, _ in tape.buckets.values()) == n_ops
+        assert len(tape.buckets) < n_ops
+
+        points = np.array([[4, 0.5], [1.5, -2], [0.1, 3]])
+        values, gradients = tape.evaluate_many(points)
+        assert gradients.shape == (3, 2)
+        for point, value, gradient in zip(points, values, gradients):
+            expected = tape.evaluate(list(point))
+            assert value == pytest.approx(expected[0])
+            assert gradient == pytest.approx(np.array(expected[1]))
+
+        with pytest.raises(AssertionError):
+            tape.evaluate_many([1, 2])
+        with pytest.raises(AssertionError):
+            tape.evaluate_many([["1", "2"]])
+
+        # outside the domain of an operation the points cannot be evaluated
+        input_nodes, output_node = self.trace(lambda x: asin(x[0]), [0.5])
+        tape = Tape(input_nodes, output_node)
+        with pytest.raises(FloatingPointError):
+            tape.evaluate_many([[0.5], [2.0]])
+
+    def test_reverse_sweep_many(self):
+        # the (compiled, if numba is installed) sweep at many points matches
+        # the interpreted sweep
+        arity = np.array([0, 0, 1, 2, 2], dtype=np.int8)
+        parents = np.array([[0, 0], [0, 0], [1, 0], [0, 2], [3, 2]],
+                           dtype=np.int32)
+        partials = np.random.default_rng(0).normal(size=(5, 2, 3))
+        adjoints = np.zeros((5, 3))
+        adjoints[4] = 1
+        expected = adjoints.copy()
+
+        interpreted = adjoints.copy()
+        _get_sweep_many()(arity, parents, partials, adjoints)
+        reverse_sweep_many(arity, parents, partials, interpreted)
+        reverse_sweep(arity, parents, partials, expected)
+        assert adjoints == pytest.approx(expected)
+        assert interpreted == pytest.approx(expected)